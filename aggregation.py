@@ -0,0 +1,137 @@
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pipeline_metrics import NULL_METRICS
+from atomic_files import write_atomic
+import xlsx_to_calendar
+from xlsx_to_calendar import pd
+
+# A meeting is the same across exports when these match, like ics_writer.event_key
+DEDUP_COLUMNS = ['section', 'day', 'start_mins', 'end_mins', 'location']
+
+# Index field -> output subdirectory
+VIEWS = {'location': 'rooms', 'instructor': 'instructors', 'course': 'courses'}
+
+def load_meeting_table(excel_file, term, stream=False):
+    """Read and parse one workbook; a module-level function so it can run in a worker"""
+    return xlsx_to_calendar.build_meeting_table(xlsx_to_calendar.process_excel_file(excel_file, stream), term)
+
+def merge_meeting_tables(tables, metrics=NULL_METRICS):
+    """Concatenate meeting tables, keeping the first copy of each meeting
+    
+    Rows are hashed on DEDUP_COLUMNS, so a section that appears in several
+    exports contributes its meetings once.
+    """
+    tables = [table for table in tables if not table.empty]
+    if not tables:
+        return pd.DataFrame(columns=xlsx_to_calendar.MEETING_COLUMNS)
+    
+    with metrics.stage('filter'):
+        merged = xlsx_to_calendar.compact_meeting_table(pd.concat(tables, ignore_index=True))
+        keys = pd.util.hash_pandas_object(merged[DEDUP_COLUMNS], index=False)
+        unique = merged[~keys.duplicated()].reset_index(drop=True)
+    metrics.count('duplicate_meetings', len(merged) - len(unique))
+    return unique
+
+def build_indexes(meetings, fields=tuple(VIEWS)):
+    """Inverted indexes {field: {value: row positions}} over a meeting table
+    
+    Rows with an empty value for a field are left out of that index.
+    """
+    indexes = {}
+    for field in fields:
+        groups = meetings.groupby(field, sort=True, observed=True).indices
+        indexes[field] = {value: rows for value, rows in groups.items() if value != ''}
+    return indexes
+
+def slugify(value):
+    """File name for an index value"""
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', str(value)).strip('_.') or 'unnamed'
+
+def unique_stem(value, stems):
+    """slugify(value), numbered past any stem already in stems by number_stem
+    
+    Distinct values can slugify alike, so later ones get -2, -3 and so on.
+    """
+    return xlsx_to_calendar.number_stem(slugify(value), stems)
+
+def write_views(meetings, indexes, out_dir, term, metrics=NULL_METRICS, only=None, manifest=None, ics_mode='weekly',
+                html_mode='full'):
+    """Write <view>/<value>.html and .ics for every index entry, plus index.json
+    
+    index.json maps each view and value to its file stem relative to
+    out_dir. Returns that mapping. Compact pages share the assets written
+    to out_dir.
+    
+    For incremental updates pass the previous manifest, which keeps file
+    names stable and lets files of vanished values be removed, and only,
+    {field: values}, to re-render just those entries.
+    """
+    term_end = xlsx_to_calendar.get_term_dates(term)[1]
+    if html_mode == 'compact':
+        import html_compact
+        html_compact.write_assets(out_dir)
+    previous = manifest or {}
+    manifest = {}
+    
+    for field, index in indexes.items():
+        view = VIEWS.get(field, field)
+        os.makedirs(os.path.join(out_dir, view), exist_ok=True)
+        known = previous.get(view, {})
+        manifest[view] = {str(value): known[str(value)] for value in index if str(value) in known}
+        stems = {entry.split('/', 1)[1].lower() for entry in manifest[view].values()}
+        
+        for value, rows in index.items():
+            if str(value) not in manifest[view]:
+                manifest[view][str(value)] = f"{view}/{unique_stem(value, stems)}"
+            elif only is not None and value not in only.get(field, ()):
+                continue
+            
+            table = meetings.iloc[rows]
+            path = os.path.join(out_dir, manifest[view][str(value)])
+            if html_mode == 'compact':
+                write_atomic(path + '.html', 'w', lambda f: html_compact.write_compact_calendar(table, f, '../', metrics))
+            else:
+                write_atomic(path + '.html', 'w', lambda f: xlsx_to_calendar.write_course_calendar(table, f, metrics))
+            write_atomic(path + '.ics', 'wb',
+                         lambda f: xlsx_to_calendar.write_ics_calendar(table, term_end, f, metrics, ics_mode))
+        
+        manifest[view] = {str(value): manifest[view][str(value)] for value in index}
+        
+        # Values that no longer have any meetings
+        for value, entry in known.items():
+            if value not in manifest[view]:
+                for extension in ('.html', '.ics'):
+                    path = os.path.join(out_dir, entry + extension)
+                    if os.path.exists(path):
+                        os.remove(path)
+    
+    write_atomic(os.path.join(out_dir, 'index.json'), 'w',
+                 lambda f: json.dump(manifest, f, indent=2, ensure_ascii=False))
+    return manifest
+
+def aggregate(inputs, out_dir, term, jobs=None, stream=False, metrics=NULL_METRICS, html_mode='full'):
+    """Merge many exports and write per-room, per-instructor and per-course calendars
+    
+    inputs are export paths or directories searched for .xlsx, .xls, .csv
+    and .tsv files (see find_excel_files). Each export is read once (in a process pool when jobs > 1); all views
+    are then rendered from the merged table. Returns write_views' manifest.
+    """
+    xlsx_to_calendar.get_term_dates(term)  # Fail fast on an invalid term
+    excel_files = []
+    for path in inputs:
+        excel_files.extend(xlsx_to_calendar.find_excel_files(path) if os.path.isdir(path) else [path])
+    metrics.count('files', len(excel_files))
+    
+    if jobs and jobs > 1 and len(excel_files) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            tables = list(executor.map(load_meeting_table, excel_files,
+                                       [term] * len(excel_files), [stream] * len(excel_files)))
+    else:
+        tables = [load_meeting_table(excel_file, term, stream) for excel_file in excel_files]
+    
+    meetings = merge_meeting_tables(tables, metrics)
+    metrics.count('meetings', len(meetings))
+    os.makedirs(out_dir, exist_ok=True)
+    return write_views(meetings, build_indexes(meetings), out_dir, term, metrics, html_mode=html_mode)
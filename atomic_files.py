@@ -0,0 +1,24 @@
+import os
+
+def temp_path(path):
+    """A temporary name next to path, unique to this writer"""
+    return f"{path}.{os.getpid()}-{os.urandom(4).hex()}.tmp"
+
+def write_atomic(path, mode, write):
+    """Write through a temporary file so readers never see a partial output
+    
+    write(f) receives the open temporary file. Only once it returns is the
+    file renamed over path; on error it is removed and path is left as it
+    was. Temporary names are unique per writer, so processes writing the
+    same path never clobber each other's file. Returns what write returned.
+    """
+    tmp_path = temp_path(path)
+    encoding = None if 'b' in mode else 'utf-8'
+    try:
+        with open(tmp_path, mode, encoding=encoding) as f:
+            result = write(f)
+        os.replace(tmp_path, path)
+        return result
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
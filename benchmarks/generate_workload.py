@@ -0,0 +1,78 @@
+"""Write synthetic Workday-style course exports for benchmarking.
+
+Usage: python benchmarks/generate_workload.py OUT.xlsx --sections 10000 [--seed 0]
+"""
+import argparse
+import random
+from openpyxl import Workbook
+
+HEADER = ['', 'Course Listing', 'Credits', 'Section', 'Instructional Format', 'Delivery Mode',
+          'Meeting Patterns', 'Instructor', 'Start Date', 'End Date']
+DEPARTMENTS = ['CPSC', 'MATH', 'PHYS', 'CHEM', 'BIOL', 'ENGL', 'HIST', 'ECON', 'PSYC', 'STAT', 'COMM', 'GEOG']
+BUILDINGS = ['DMP', 'ICCS', 'LSK', 'BUCH', 'MATH', 'HENN', 'CHEM', 'SWNG', 'ESB', 'IBLC']
+DAY_SETS = ['Mon Wed Fri', 'Tue Thu', 'Mon Wed', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri']
+TERMS = [('2024-09-03', '2024-12-05'), ('2025-01-06', '2025-04-08')]
+FIRST_NAMES = ['Alex', 'Sam', 'Jordan', 'Taylor', 'Morgan', 'Casey', 'Riley', 'Jamie']
+LAST_NAMES = ['Chen', 'Singh', 'Smith', 'Nguyen', 'Martin', 'Kim', 'Brown', 'Wong']
+
+def format_clock(minutes, twelve_hour):
+    """Format a time the way Workday does, in 12h ('9:30 a.m.') or 24h form"""
+    hour, minute = divmod(minutes, 60)
+    if not twelve_hour:
+        return f"{hour:02d}:{minute:02d}"
+    suffix = 'a.m.' if hour < 12 else 'p.m.'
+    return f"{(hour - 1) % 12 + 1}:{minute:02d} {suffix}"
+
+def meeting_block(rng, term, lab=False):
+    """One 'dates | days | times | location' block"""
+    start = rng.randrange(8 * 60, 19 * 60, 30)
+    length = rng.choice([110, 170]) if lab else rng.choice([50, 80])
+    twelve_hour = rng.random() < 0.7
+    days = rng.choice(DAY_SETS[3:] if lab else DAY_SETS)
+    building = rng.choice(BUILDINGS)
+    location = f"{building}-Floor {rng.randint(0, 4)}-Room {rng.randint(100, 499)}"
+    return (f"{term[0]} - {term[1]} | {days} | "
+            f"{format_clock(start, twelve_hour)} - {format_clock(start + length, twelve_hour)} | {location}")
+
+def generate_rows(sections, seed=0):
+    """Yield spreadsheet rows for the given number of sections"""
+    rng = random.Random(seed)
+    for i in range(sections):
+        department = rng.choice(DEPARTMENTS)
+        number = rng.randint(100, 499)
+        title = f"Course {number}"
+        course = f"{department}_V {number} - {title}"
+        lab = rng.random() < 0.25
+        section_code = f"L{rng.randint(1, 9)}{rng.choice('ABCDE')}" if lab else f"{rng.randint(1, 2)}{i % 100:02d}"
+        term = rng.choice(TERMS)
+        
+        blocks = [meeting_block(rng, term, lab)]
+        if not lab and rng.random() < 0.2:
+            blocks.append(meeting_block(rng, rng.choice(TERMS)))
+        
+        instructor = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        yield ['', course, 3, f"{department}_V {number}-{section_code} - {title}",
+               'Laboratory' if lab else 'Lecture', 'In Person', '\n\n'.join(blocks),
+               instructor, term[0], term[1]]
+
+def write_workbook(path, sections, seed=0):
+    """Write an export with the header on row 3, as Workday does"""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('View My Courses')
+    ws.append(['View My Courses'])
+    ws.append([])
+    ws.append(HEADER)
+    for row in generate_rows(sections, seed):
+        ws.append(row)
+    wb.save(path)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('output')
+    parser.add_argument('--sections', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    write_workbook(args.output, args.sections, args.seed)
+
+if __name__ == '__main__':
+    main()
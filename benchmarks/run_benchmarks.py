@@ -0,0 +1,185 @@
+"""Time each stage of the conversion pipeline on synthetic exports.
+
+Usage: python benchmarks/run_benchmarks.py [--sizes 10 1000 10000] [--baseline benchmarks/baseline.json]
+                                          [--update-baseline] [--tolerance 0.25] [--no-memory]
+
+Workloads are generated into a temporary directory (or --workdir, where
+they are kept and reused). Each stage is timed on its own, then run again
+under tracemalloc for peak memory unless --no-memory is given. Results are
+compared against the baseline; throughput that drops by more than the
+tolerance is reported as a regression and the exit status is 1.
+
+Startup is checked separately: importing xlsx_to_calendar in a fresh
+interpreter must stay under STARTUP_BUDGET seconds and must not pull in
+any of HEAVY_MODULES, which are only loaded once a conversion needs them.
+"""
+import argparse
+import importlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time_parsing
+import xlsx_to_calendar
+from generate_workload import write_workbook
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+TERM = 'term1'
+STARTUP_BUDGET = 0.25
+HEAVY_MODULES = ['pandas', 'numpy', 'pytz', 'icalendar', 'openpyxl']
+STARTUP_SCRIPT = (
+    "import sys, time; started = time.perf_counter(); import xlsx_to_calendar; "
+    "print(time.perf_counter() - started); print(*[m for m in %r if m in sys.modules])" % HEAVY_MODULES
+)
+
+def measure(func, track_memory=True):
+    """Run func and return (result, seconds, peak bytes or None)"""
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    
+    peak = None
+    if track_memory:
+        tracemalloc.start()
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+def cold(func):
+    """func with the memoized clock and date parsers emptied before every call
+    
+    Each parse stage would otherwise run on the caches warmed by the one
+    before it, and the stages would not be comparable.
+    """
+    def run():
+        time_parsing.parse_clock.cache_clear()
+        time_parsing.parse_date.cache_clear()
+        return func()
+    return run
+
+def parse_per_cell(df):
+    """The row-at-a-time parser over the whole column"""
+    return [xlsx_to_calendar.parse_meeting_pattern(cell) for cell in df['Meeting Patterns']]
+
+def run_size(path, sections, track_memory):
+    """Benchmark every stage on one workload; returns {stage: stats}"""
+    term_end = xlsx_to_calendar.get_term_dates(TERM)[1]
+    results = {}
+    
+    def record(stage, func, items):
+        result, elapsed, peak = measure(func, track_memory)
+        results[stage] = {
+            'seconds': round(elapsed, 6),
+            'items': items,
+            'items_per_second': round(items / elapsed, 1) if elapsed else None,
+            'peak_bytes': peak,
+        }
+        return result
+    
+    df = record('process_excel_file', lambda: xlsx_to_calendar.process_excel_file(path), sections)
+    record('parse_meeting_pattern', cold(lambda: parse_per_cell(df)), sections)
+    record('parse_meeting_patterns', cold(lambda: xlsx_to_calendar.parse_meeting_patterns(df['Meeting Patterns'])), sections)
+    meetings = record('build_meeting_table', cold(lambda: xlsx_to_calendar.build_meeting_table(df, TERM)), sections)
+    record('generate_course_calendar', lambda: xlsx_to_calendar.generate_course_calendar(meetings), len(meetings))
+    record('generate_ics_calendar', lambda: xlsx_to_calendar.generate_ics_calendar(meetings, term_end).to_ical(), len(meetings))
+    record('write_ics_calendar', lambda: xlsx_to_calendar.write_ics_calendar(meetings, term_end, io.BytesIO()), len(meetings))
+    return results
+
+def measure_startup(runs=5):
+    """Best import time of xlsx_to_calendar over fresh interpreters, and the heavy modules it loaded"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    best, loaded = None, []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT], cwd=root, check=True,
+                                capture_output=True, text=True).stdout.splitlines()
+        elapsed = float(output[0])
+        best = elapsed if best is None else min(best, elapsed)
+        loaded = output[1].split() if len(output) > 1 else []
+    return best, loaded
+
+def compare(results, baseline, tolerance):
+    """List (size, stage, baseline rate, current rate) that regressed"""
+    regressions = []
+    for size, stages in results.items():
+        for stage, stats in stages.items():
+            expected = baseline.get(size, {}).get(stage, {}).get('items_per_second')
+            current = stats['items_per_second']
+            if expected and current and current < expected * (1 - tolerance):
+                regressions.append((size, stage, expected, current))
+    return regressions
+
+def print_report(results):
+    print(f"{'sections':>9} {'stage':<26} {'seconds':>10} {'items/s':>12} {'peak MiB':>9}")
+    for size, stages in results.items():
+        for stage, stats in stages.items():
+            peak = f"{stats['peak_bytes'] / 2 ** 20:9.1f}" if stats['peak_bytes'] is not None else f"{'-':>9}"
+            print(f"{size:>9} {stage:<26} {stats['seconds']:>10.4f} {stats['items_per_second'] or 0:>12.1f} {peak}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 10000])
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--no-memory', dest='track_memory', action='store_false')
+    parser.add_argument('--workdir', help='keep generated workloads here and reuse them')
+    parser.add_argument('--output', help='also write results as JSON')
+    args = parser.parse_args()
+    
+    # Pay the deferred imports up front so they do not land in the first stage timed
+    for name in HEAVY_MODULES:
+        importlib.import_module(name)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = args.workdir or tmp
+        os.makedirs(workdir, exist_ok=True)
+        results = {}
+        for sections in args.sizes:
+            path = os.path.join(workdir, f"workload_{sections}.xlsx")
+            if not os.path.exists(path):
+                write_workbook(path, sections)
+            results[str(sections)] = run_size(path, sections, args.track_memory)
+    
+    print_report(results)
+    startup, loaded = measure_startup()
+    print(f"\nimport xlsx_to_calendar: {startup * 1000:.1f} ms (budget {STARTUP_BUDGET * 1000:.0f} ms)")
+    startup_failures = []
+    if startup > STARTUP_BUDGET:
+        startup_failures.append(f"startup took {startup * 1000:.1f} ms")
+    if loaded:
+        startup_failures.append(f"startup imported {', '.join(loaded)}")
+    for failure in startup_failures:
+        print(f"REGRESSION {failure}")
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+        return 1 if startup_failures else 0
+    
+    if not os.path.exists(args.baseline):
+        print("\nNo baseline to compare against (run with --update-baseline)")
+        return 1 if startup_failures else 0
+    
+    with open(args.baseline, encoding='utf-8') as f:
+        regressions = compare(results, json.load(f), args.tolerance)
+    for size, stage, expected, current in regressions:
+        print(f"REGRESSION {stage} @ {size} sections: {current:.1f}/s vs baseline {expected:.1f}/s")
+    if not regressions:
+        print("\nNo regressions against baseline")
+    return 1 if regressions or startup_failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,105 @@
+import hashlib
+import os
+import shutil
+import tempfile
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'xlsx_to_calendar')
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Full eviction scans run when the estimated size passes the limit, and
+# at least every EVICT_EVERY stores to pick up other processes' entries
+EVICT_EVERY = 64
+
+# cache_dir -> [estimated bytes, stores since the last scan]
+_estimates = {}
+
+def get_cache_dir():
+    """Cache location, overridable with XLSX_TO_CALENDAR_CACHE"""
+    return os.environ.get('XLSX_TO_CALENDAR_CACHE', DEFAULT_CACHE_DIR)
+
+def file_digest(path):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def make_key(input_digest, *parts):
+    """Combine an input digest with term, version and other settings"""
+    return hashlib.sha256('\0'.join([input_digest, *map(str, parts)]).encode('utf-8')).hexdigest()
+
+def lookup(key, cache_dir=None):
+    """Return the entry directory for key, or None on a miss"""
+    entry = os.path.join(cache_dir or get_cache_dir(), key)
+    if not os.path.isdir(entry):
+        return None
+    
+    # Mark as recently used for LRU eviction
+    try:
+        os.utime(entry)
+    except FileNotFoundError:
+        return None  # Evicted in the meantime
+    return entry
+
+def store(key, files, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+    """Store {filename: bytes} under key and evict old entries past max_bytes
+    
+    The cache size is tracked as a running estimate, so a store only scans
+    the cache when the estimate passes max_bytes or every EVICT_EVERY
+    stores, not every time.
+    """
+    cache_dir = cache_dir or get_cache_dir()
+    os.makedirs(cache_dir, exist_ok=True)
+    
+    # Build the entry next to its final location and move it in atomically
+    staging = tempfile.mkdtemp(dir=cache_dir, prefix='.tmp-')
+    try:
+        for name, content in files.items():
+            with open(os.path.join(staging, name), 'wb') as f:
+                f.write(content)
+        os.replace(staging, os.path.join(cache_dir, key))
+    except OSError:
+        # Another worker stored the same key first
+        shutil.rmtree(staging, ignore_errors=True)
+    
+    estimate = _estimates.get(cache_dir)
+    if estimate is None:
+        estimate = _estimates[cache_dir] = [evict(cache_dir, max_bytes), 0]
+    else:
+        estimate[0] += sum(len(content) for content in files.values())
+        estimate[1] += 1
+        if estimate[0] > max_bytes or estimate[1] >= EVICT_EVERY:
+            estimate[:] = [evict(cache_dir, max_bytes), 0]
+    return os.path.join(cache_dir, key)
+
+def evict(cache_dir, max_bytes):
+    """Remove least recently used entries until the cache fits in max_bytes
+    
+    An entry is renamed to a hidden name before it is deleted, so readers
+    either find it complete or not at all. Returns the remaining size.
+    """
+    entries = []
+    total = 0
+    for name in os.listdir(cache_dir):
+        entry = os.path.join(cache_dir, name)
+        if name.startswith('.') or not os.path.isdir(entry):
+            continue
+        try:
+            size = sum(os.path.getsize(os.path.join(entry, f)) for f in os.listdir(entry))
+            entries.append((os.path.getmtime(entry), size, entry))
+        except OSError:
+            continue
+        total += size
+    
+    for _, size, entry in sorted(entries):
+        if total <= max_bytes:
+            break
+        doomed = os.path.join(cache_dir, f".evict-{os.getpid()}-{os.path.basename(entry)}")
+        try:
+            os.rename(entry, doomed)
+        except OSError:
+            continue  # Already evicted by another process
+        shutil.rmtree(doomed, ignore_errors=True)
+        total -= size
+    return total
@@ -0,0 +1,58 @@
+import heapq
+from collections import namedtuple
+
+# lane is the column an item occupies, lanes the column count of its
+# overlap cluster (items that transitively overlap share the same count)
+Placement = namedtuple('Placement', ['item', 'start', 'end', 'lane', 'lanes'])
+Conflict = namedtuple('Conflict', ['first', 'second', 'start', 'end'])
+
+def assign_lanes(intervals):
+    """Lay out (start, end, item) intervals in side-by-side lanes
+    
+    One sweep over the intervals sorted by start, with a heap of running
+    intervals and a heap of free lanes: O(n log n). Each interval takes the
+    lowest free lane, so the lane count of a cluster equals its peak
+    concurrency. Touching intervals (one ends as the next starts) do not
+    overlap. Returns Placements in start order (stable for ties).
+    """
+    placements = []
+    active = []  # (end, lane) of running intervals
+    free = []  # lanes released inside the current cluster
+    cluster_start = 0
+    cluster_lanes = 0
+    
+    for start, end, item in sorted(intervals, key=lambda interval: interval[0]):
+        while active and active[0][0] <= start:
+            heapq.heappush(free, heapq.heappop(active)[1])
+        
+        if not active:
+            # Previous cluster is complete; fix its lane count
+            for i in range(cluster_start, len(placements)):
+                placements[i] = placements[i]._replace(lanes=cluster_lanes)
+            cluster_start, cluster_lanes, free = len(placements), 0, []
+        
+        lane = heapq.heappop(free) if free else cluster_lanes
+        cluster_lanes = max(cluster_lanes, lane + 1)
+        heapq.heappush(active, (end, lane))
+        placements.append(Placement(item, start, end, lane, 0))
+    
+    for i in range(cluster_start, len(placements)):
+        placements[i] = placements[i]._replace(lanes=cluster_lanes)
+    return placements
+
+def find_conflicts(intervals):
+    """List every overlapping pair of (start, end, item) intervals
+    
+    Sweeps in start order keeping the running intervals in a heap, so the
+    cost is O(n log n + k) for k conflicts rather than checking all pairs.
+    """
+    conflicts = []
+    active = []  # (end, sequence, item)
+    
+    for sequence, (start, end, item) in enumerate(sorted(intervals, key=lambda interval: interval[0])):
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+        for other_end, _, other in active:
+            conflicts.append(Conflict(other, item, start, min(end, other_end)))
+        heapq.heappush(active, (end, sequence, item))
+    return conflicts
@@ -0,0 +1,309 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from email.parser import BytesParser
+from email.policy import HTTP
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import calendar_cache
+from pipeline_metrics import PipelineMetrics
+from term_registry import default_registry
+
+logger = logging.getLogger('xlsx_to_calendar')
+
+MAX_UPLOAD_BYTES = 20 * 1024 * 1024
+RETRY_AFTER_SECONDS = 5
+FORMATS = {
+    'html': ('out.html', 'text/html; charset=utf-8'),
+    'ics': ('out.ics', 'text/calendar; charset=utf-8'),
+    'both': (None, 'application/zip'),
+}
+
+UPLOAD_FORM = b"""<!DOCTYPE html>
+<html>
+<head><meta charset="UTF-8"><title>Course Schedule Converter</title></head>
+<body>
+    <form method="post" action="/convert" enctype="multipart/form-data">
+        <p><input type="file" name="file" accept=".xlsx,.xls,.csv,.tsv"></p>
+        <p>Term <input type="text" name="term" value="term1"></p>
+        <p>
+            <select name="format">
+                <option value="both">HTML and ICS (zip)</option>
+                <option value="html">HTML</option>
+                <option value="ics">ICS</option>
+            </select>
+        </p>
+        <p><input type="submit" value="Convert"></p>
+    </form>
+</body>
+</html>
+"""
+
+class ServiceError(Exception):
+    """A request that cannot be served, with the HTTP status to answer with"""
+    
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def convert_upload(data, term):
+    """Worker entry point: convert workbook bytes into {filename: bytes} and a metrics dict"""
+    import xlsx_to_calendar
+    
+    metrics = PipelineMetrics()
+    term_end = xlsx_to_calendar.get_term_dates(term)[1]
+    df = xlsx_to_calendar.process_excel_file(io.BytesIO(data), metrics=metrics)
+    meetings = xlsx_to_calendar.build_meeting_table(df, term, metrics=metrics)
+    
+    html = io.StringIO()
+    xlsx_to_calendar.write_course_calendar(meetings, html, metrics)
+    ics = io.BytesIO()
+    xlsx_to_calendar.write_ics_calendar(meetings, term_end, ics, metrics)
+    return {'out.html': html.getvalue().encode('utf-8'), 'out.ics': ics.getvalue()}, metrics.to_dict()
+
+def bundle(files):
+    """Zip the HTML and ICS outputs under their usual download names"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, content in files.items():
+            archive.writestr('course_calendar' + os.path.splitext(name)[1], content)
+    return buffer.getvalue()
+
+class ConversionService:
+    """Converts uploads in a bounded process pool, caching results by input hash
+    
+    At most jobs conversions run at once and up to queue_size more wait for
+    a worker; anything beyond that is refused so a burst of uploads sheds
+    load instead of piling up. Results are kept in calendar_cache, keyed by
+    the upload's SHA-256, the term, the term registry's digest,
+    PARSER_VERSION and GENERATOR_VERSION.
+    """
+    
+    def __init__(self, jobs=None, queue_size=16, cache_dir=None):
+        self.jobs = jobs or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.cache_dir = cache_dir
+        self.executor = ProcessPoolExecutor(max_workers=self.jobs)
+        self.slots = threading.BoundedSemaphore(self.jobs + queue_size)
+        self.lock = threading.Lock()
+        self.pipeline = PipelineMetrics()
+        self.counters = {'requests': 0, 'conversions': 0, 'cache_hits': 0, 'not_modified': 0,
+                         'rejected': 0, 'failures': 0, 'in_flight': 0}
+        self.conversion_seconds = 0.0
+    
+    def _count(self, name, n=1):
+        """Increment a service counter"""
+        with self.lock:
+            self.counters[name] += n
+    
+    def cache_key(self, data, term):
+        """The cache key of converting data for term, also the base of the response ETag"""
+        from xlsx_to_calendar import GENERATOR_VERSION, PARSER_VERSION
+        
+        registry = default_registry()
+        term_id = registry.get(term).id  # Fail fast on an invalid term
+        return calendar_cache.make_key(hashlib.sha256(data).hexdigest(), term_id, registry.digest(), PARSER_VERSION,
+                                       GENERATOR_VERSION, 'service')
+    
+    def convert(self, data, term, key=None):
+        """Return ({filename: bytes}, cache key), converting on a cache miss
+        
+        key, if given, is cache_key(data, term) computed by the caller.
+        Raises ServiceError with 503 when every worker and queue slot is taken.
+        """
+        key = key or self.cache_key(data, term)
+        entry = calendar_cache.lookup(key, self.cache_dir)
+        files = self._read_entry(entry) if entry else None
+        if files:
+            self._count('cache_hits')
+            return files, key
+        
+        if not self.slots.acquire(blocking=False):
+            self._count('rejected')
+            raise ServiceError(HTTPStatus.SERVICE_UNAVAILABLE, 'All workers are busy, try again shortly')
+        self._count('in_flight')
+        started = time.perf_counter()
+        try:
+            files, metrics = self.executor.submit(convert_upload, data, term).result()
+        except Exception as e:
+            self._count('failures')
+            raise ServiceError(HTTPStatus.UNPROCESSABLE_ENTITY, f"{type(e).__name__}: {e}") from e
+        finally:
+            self.slots.release()
+            self._count('in_flight', -1)
+        
+        with self.lock:
+            self.counters['conversions'] += 1
+            self.conversion_seconds += time.perf_counter() - started
+            self.pipeline.merge(metrics)
+        calendar_cache.store(key, files, self.cache_dir)
+        return files, key
+    
+    def _read_entry(self, entry):
+        """Load the outputs stored in a cache entry, or None if it was evicted meanwhile"""
+        files = {}
+        try:
+            for name in ('out.html', 'out.ics'):
+                with open(os.path.join(entry, name), 'rb') as f:
+                    files[name] = f.read()
+        except FileNotFoundError:
+            return None
+        return files
+    
+    def metrics(self):
+        """Service counters, pool configuration and merged pipeline metrics"""
+        with self.lock:
+            return {
+                **self.counters,
+                'workers': self.jobs,
+                'queue_size': self.queue_size,
+                'conversion_seconds': round(self.conversion_seconds, 6),
+                'pipeline': self.pipeline.to_dict(),
+            }
+    
+    def shutdown(self):
+        """Stop the worker processes"""
+        self.executor.shutdown(cancel_futures=True)
+
+def read_upload(content_type, body):
+    """Return (workbook bytes, form fields) from a raw or multipart/form-data body"""
+    if not content_type.startswith('multipart/form-data'):
+        return body, {}
+    
+    message = BytesParser(policy=HTTP).parsebytes(
+        b'Content-Type: ' + content_type.encode('latin-1') + b'\r\n\r\n' + body)
+    data, fields = None, {}
+    for part in message.iter_parts():
+        name = part.get_param('name', header='content-disposition')
+        if part.get_filename() is not None:
+            data = part.get_payload(decode=True)
+        elif name:
+            fields[name] = part.get_content().strip()
+    if data is None:
+        raise ServiceError(HTTPStatus.BAD_REQUEST, "Missing 'file' field")
+    return data, fields
+
+class ConversionHandler(BaseHTTPRequestHandler):
+    """HTTP front end; the server's service attribute does the work
+    
+    GET /           upload form
+    POST /convert   workbook as the raw body or a multipart 'file' field;
+                    term and format (html, ics or both) as query or form fields
+    GET /metrics    JSON counters
+    """
+    
+    server_version = 'xlsx-to-calendar'
+    
+    def log_message(self, format, *args):
+        """Route access logs through the module logger"""
+        logger.info("%s - %s", self.address_string(), format % args)
+    
+    def send_body(self, status, content_type, body, headers=()):
+        """Send a complete response; HEAD gets the headers only"""
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+    
+    def send_error_body(self, status, message, headers=()):
+        """Send an error as {"error": message}"""
+        self.send_body(status, 'application/json', json.dumps({'error': message}).encode('utf-8'), headers)
+    
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        if path == '/':
+            self.send_body(HTTPStatus.OK, 'text/html; charset=utf-8', UPLOAD_FORM)
+        elif path == '/metrics':
+            body = json.dumps(self.server.service.metrics(), indent=2).encode('utf-8')
+            self.send_body(HTTPStatus.OK, 'application/json', body)
+        else:
+            self.send_error_body(HTTPStatus.NOT_FOUND, 'Not found')
+    
+    do_HEAD = do_GET
+    
+    def do_POST(self):
+        service = self.server.service
+        service._count('requests')
+        url = urlsplit(self.path)
+        if url.path != '/convert':
+            self.send_error_body(HTTPStatus.NOT_FOUND, 'Not found')
+            return
+        
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            if length > MAX_UPLOAD_BYTES:
+                raise ServiceError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"Uploads are limited to {MAX_UPLOAD_BYTES} bytes")
+            data, fields = read_upload(self.headers.get('Content-Type', ''), self.rfile.read(length))
+            if not data:
+                raise ServiceError(HTTPStatus.BAD_REQUEST, 'Empty upload')
+            
+            query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+            options = {**query, **fields}
+            term = options.get('term', 'term1')
+            output = options.get('format', 'both')
+            if output not in FORMATS:
+                raise ServiceError(HTTPStatus.BAD_REQUEST, f"format must be one of {', '.join(FORMATS)}")
+            try:
+                key = service.cache_key(data, term)
+            except ValueError as e:
+                raise ServiceError(HTTPStatus.BAD_REQUEST, str(e)) from e
+            
+            # Each representation of a result gets its own validator. A client
+            # that already holds it is answered before any lookup or conversion.
+            etag = f'"{key[:32]}-{output}"'
+            if etag in (tag.strip() for tag in self.headers.get('If-None-Match', '').split(',')):
+                service._count('not_modified')
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            
+            try:
+                files, key = service.convert(data, term, key)
+            except ValueError as e:
+                raise ServiceError(HTTPStatus.BAD_REQUEST, str(e)) from e
+        except ServiceError as e:
+            headers = [('Retry-After', str(RETRY_AFTER_SECONDS))] if e.status == HTTPStatus.SERVICE_UNAVAILABLE else []
+            self.send_error_body(e.status, str(e), headers)
+            return
+        
+        name, content_type = FORMATS[output]
+        body = bundle(files) if name is None else files[name]
+        extension = '.zip' if name is None else os.path.splitext(name)[1]
+        self.send_body(HTTPStatus.OK, content_type, body, [
+            ('ETag', etag),
+            ('Cache-Control', 'private, max-age=0, must-revalidate'),
+            ('Content-Disposition', f'attachment; filename="course_calendar{extension}"'),
+        ])
+
+def make_server(host='127.0.0.1', port=8000, jobs=None, queue_size=16, cache_dir=None):
+    """Create a server bound to host:port; port 0 picks a free port"""
+    server = ThreadingHTTPServer((host, port), ConversionHandler)
+    server.daemon_threads = True
+    server.service = ConversionService(jobs, queue_size, cache_dir)
+    return server
+
+def serve(host='127.0.0.1', port=8000, jobs=None, queue_size=16):
+    """Run the service until interrupted"""
+    server = make_server(host, port, jobs, queue_size)
+    print(f"Serving on http://{server.server_address[0]}:{server.server_address[1]}/ "
+          f"with {server.service.jobs} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.shutdown()
+    return 0
@@ -1,92 +1,248 @@
 import os
+import queue
+import threading
 import tkinter as tk
 from tkinter import filedialog, messagebox
 from tkinter import ttk
-from xlsx_to_calendar import process_excel_file, generate_course_calendar, generate_ics_calendar, get_term_dates
+from term_registry import default_registry
+from pipeline_metrics import PipelineMetrics
+from atomic_files import write_atomic  # 取消或崩溃时不会留下半截文件
+
+CHUNK_ROWS = 500  # 每次解析的行数，决定进度更新的粒度
+POLL_MS = 100
+
+class ConversionCancelled(Exception):
+    """用户点击取消后由进度回调抛出"""
+
+def convert_with_progress(excel_file, out_dir, term, base_name, report, cancel_event):
+    """在后台线程中转换一个文件，通过 report(阶段, 已完成, 总数) 报告进度"""
+    # 转换模块较重，推迟到后台线程中导入，窗口可以立即显示
+    import pandas as pd
+    from xlsx_to_calendar import process_excel_file, build_meeting_table, compact_meeting_table, write_course_calendar, write_ics_calendar, get_term_dates
+    
+    def check_cancel(*_):
+        if cancel_event.is_set():
+            raise ConversionCancelled()
+    
+    term_end = get_term_dates(term)[1]
+    report('读取', 0, 1)
+    df = process_excel_file(excel_file)
+    check_cancel()
+    
+    # 分块解析，以便报告已解析的行数
+    tables = []
+    for start in range(0, len(df), CHUNK_ROWS):
+        tables.append(build_meeting_table(df.iloc[start:start + CHUNK_ROWS], term))
+        report('解析', min(start + CHUNK_ROWS, len(df)), len(df))
+        check_cancel()
+    meetings = compact_meeting_table(pd.concat(tables, ignore_index=True)) if tables else build_meeting_table(df, term)
+    
+    # 在导出目录生成HTML日历
+    report('生成网页', 0, 1)
+    html_path = os.path.join(out_dir, base_name + '.html')
+    write_atomic(html_path, 'w', lambda f: write_course_calendar(meetings, f))
+    check_cancel()
+    
+    # 在导出目录生成ICS日历，每写出一个事件报告一次
+    total_events = len(meetings)
+    written = 0
+    
+    def on_metric(kind, name, value):
+        nonlocal written
+        if kind == 'count' and name == 'events_written':
+            written += value
+            if written % 50 == 0:
+                report('写入事件', written, total_events)
+            check_cancel()
+    
+    metrics = PipelineMetrics(hooks=[on_metric])
+    ics_path = os.path.join(out_dir, base_name + '.ics')
+    write_atomic(ics_path, 'wb', lambda f: write_ics_calendar(meetings, term_end, f, metrics))
+    report('写入事件', total_events, total_events)
+    return html_path, ics_path
+
+def output_names(files):
+    """每个文件的输出文件名（不含扩展名）
+    
+    单个文件沿用固定文件名，多个文件按 xlsx_to_calendar.output_stems 命名，
+    与批量转换一致：同一目录下的 a.xlsx 与 a.csv 分别输出为 a_xlsx 与 a_csv；
+    所有输出都写入同一个导出目录，其余重名依次加上 -2、-3……，避免互相覆盖。
+    """
+    if len(files) == 1:
+        return ['course_calendar']
+    from xlsx_to_calendar import output_stems
+    stems = output_stems(files, flat=True)
+    return [stems[excel_file] for excel_file in files]
+
+def conversion_worker(files, out_dir, term, messages, cancel_event):
+    """依次转换队列中的文件，把进度与结果放入 messages 队列"""
+    for index, (excel_file, base_name) in enumerate(zip(files, output_names(files))):
+        if cancel_event.is_set():
+            break
+        
+        def report(phase, done, total):
+            messages.put(('progress', index, phase, done, total))
+        
+        try:
+            paths = convert_with_progress(excel_file, out_dir, term, base_name, report, cancel_event)
+            messages.put(('done', index, paths))
+        except ConversionCancelled:
+            break
+        except Exception as e:
+            messages.put(('error', index, str(e)))
+    
+    messages.put(('finished', cancel_event.is_set()))
 
 def generate_calendars():
     # 验证选择
-    if not selected_file.get():
-        messagebox.showwarning("警告", "请先选择一个 Excel 文件。")
+    files = list(file_list.get(0, tk.END))
+    if not files:
+        messagebox.showwarning("警告", "请先选择至少一个 Excel 文件。")
         return
     if not output_dir.get():
         messagebox.showwarning("警告", "请先选择一个导出目录。")
         return
     
-    # 启动进度条（不确定模式）
-    progress_bar.grid(row=4, column=0, columnspan=3, pady=10)
-    progress_bar.start()
-    root.update_idletasks()
+    # 启动进度条（确定模式）
+    progress_bar.grid(row=4, column=0, columnspan=3, pady=(10, 0))
+    status_label.grid(row=5, column=0, columnspan=3, pady=(0, 10))
+    progress_bar['value'] = 0
+    generate_button.config(state=tk.DISABLED)
+    cancel_button.config(state=tk.NORMAL)
+    
+    state['files'] = files
+    state['results'] = []
+    state['errors'] = []
+    state['cancel'] = threading.Event()
+    state['messages'] = queue.Queue()
     
-    selected_term = term_var.get()  # 'term1' or 'term2'
+    # 转换在后台线程进行，主线程只负责刷新界面
+    worker = threading.Thread(
+        target=conversion_worker,
+        args=(files, output_dir.get(), term_var.get(), state['messages'], state['cancel']),
+        daemon=True
+    )
+    worker.start()
+    root.after(POLL_MS, poll_messages)
+
+# 各阶段在单个文件进度中所占的区间
+PHASE_RANGES = {'读取': (0, 10), '解析': (10, 60), '生成网页': (60, 70), '写入事件': (70, 100)}
+
+def poll_messages():
+    """在主线程中读取后台线程的消息并更新界面"""
+    files = state['files']
     try:
-        term_start, term_end = get_term_dates(selected_term)
-        df = process_excel_file(selected_file.get())
-        
-        # 在导出目录生成HTML日历
-        html_content = generate_course_calendar(df, selected_term)
-        html_path = os.path.join(output_dir.get(), 'course_calendar.html')
-        with open(html_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        # 在导出目录生成ICS日历
-        cal = generate_ics_calendar(df, term_start, term_end, selected_term)
-        ics_path = os.path.join(output_dir.get(), 'course_calendar.ics')
-        with open(ics_path, 'wb') as f:
-            f.write(cal.to_ical())
-        
-        progress_bar.stop()
-        progress_bar.grid_remove()
-        
-        messagebox.showinfo("成功", f"HTML 与 ICS 日历已成功生成！\n请查看目录：\n{output_dir.get()}")
-    except Exception as e:
-        progress_bar.stop()
-        progress_bar.grid_remove()
-        messagebox.showerror("错误", f"生成失败：{str(e)}")
+        while True:
+            message = state['messages'].get_nowait()
+            kind = message[0]
+            
+            if kind == 'progress':
+                _, index, phase, done, total = message
+                low, high = PHASE_RANGES[phase]
+                fraction = done / total if total else 1
+                progress_bar['value'] = (index + (low + (high - low) * fraction) / 100) / len(files) * 100
+                status_var.set(f"[{index + 1}/{len(files)}] {os.path.basename(files[index])}：{phase} {done}/{total}")
+            elif kind == 'done':
+                state['results'].append(message[2])
+            elif kind == 'error':
+                state['errors'].append(f"{os.path.basename(files[message[1]])}：{message[2]}")
+            elif kind == 'finished':
+                finish(cancelled=message[1])
+                return
+    except queue.Empty:
+        pass
+    root.after(POLL_MS, poll_messages)
+
+def finish(cancelled):
+    """恢复界面并汇总结果"""
+    progress_bar.grid_remove()
+    status_label.grid_remove()
+    generate_button.config(state=tk.NORMAL)
+    cancel_button.config(state=tk.DISABLED)
+    
+    summary = f"已生成 {len(state['results'])}/{len(state['files'])} 个文件的 HTML 与 ICS 日历。\n请查看目录：\n{output_dir.get()}"
+    if state['errors']:
+        messagebox.showerror("错误", summary + "\n\n生成失败：\n" + "\n".join(state['errors']))
+    elif cancelled:
+        messagebox.showinfo("已取消", summary)
+    else:
+        messagebox.showinfo("成功", summary)
+
+def cancel_conversion():
+    """通知后台线程在下一个检查点停止"""
+    if state.get('cancel'):
+        state['cancel'].set()
+        status_var.set("正在取消…")
+        cancel_button.config(state=tk.DISABLED)
 
 def choose_file():
-    file_path = filedialog.askopenfilename(filetypes=[("Excel文件", "*.xlsx *.xls")])
-    if file_path:
-        selected_file.set(file_path)
+    file_paths = filedialog.askopenfilenames(filetypes=[("Excel文件", "*.xlsx *.xls"), ("CSV/TSV文件", "*.csv *.tsv")])
+    for file_path in file_paths:
+        if file_path not in file_list.get(0, tk.END):
+            file_list.insert(tk.END, file_path)
+
+def clear_files():
+    file_list.delete(0, tk.END)
 
 def choose_directory():
     directory = filedialog.askdirectory()
     if directory:
         output_dir.set(directory)
 
-root = tk.Tk()
-root.title("UBC Workday Excel课表转换器")
-
-selected_file = tk.StringVar()
-output_dir = tk.StringVar()
-term_var = tk.StringVar(value='term1')
-
-# 文件选择区
-file_frame = tk.Frame(root)
-file_frame.grid(row=0, column=0, columnspan=3, pady=10, padx=10, sticky='w')
-tk.Label(file_frame, text="选择Excel文件:").grid(row=0, column=0, padx=5, sticky='e')
-tk.Entry(file_frame, textvariable=selected_file, width=50).grid(row=0, column=1, padx=5)
-tk.Button(file_frame, text="浏览...", command=choose_file).grid(row=0, column=2, padx=5)
-
-# 导出目录选择区
-out_frame = tk.Frame(root)
-out_frame.grid(row=1, column=0, columnspan=3, pady=10, padx=10, sticky='w')
-tk.Label(out_frame, text="选择导出目录:").grid(row=0, column=0, padx=5, sticky='e')
-tk.Entry(out_frame, textvariable=output_dir, width=50).grid(row=0, column=1, padx=5)
-tk.Button(out_frame, text="浏览...", command=choose_directory).grid(row=0, column=2, padx=5)
-
-# 学期选择区
-term_frame = tk.Frame(root)
-term_frame.grid(row=2, column=0, columnspan=3, pady=10, padx=10, sticky='w')
-tk.Label(term_frame, text="选择学期：").grid(row=0, column=0, padx=5)
-tk.Radiobutton(term_frame, text="Term 1 (2024/09/03-2024/12/06)", variable=term_var, value='term1').grid(row=0, column=1, padx=5)
-tk.Radiobutton(term_frame, text="Term 2 (2025/01/06-2025/04/06)", variable=term_var, value='term2').grid(row=0, column=2, padx=5)
-
-# 生成按钮
-tk.Button(root, text="生成日历", command=generate_calendars, bg="#4CAF50", fg="white", padx=20, pady=5).grid(row=3, column=0, columnspan=3, pady=20)
-
-# 进度条（初始隐藏）
-progress_bar = ttk.Progressbar(root, orient='horizontal', mode='indeterminate', length=300)
-
-root.resizable(False, False)
-root.mainloop()
\ No newline at end of file
+# 当前一次转换的状态；界面控件由 main() 创建
+state = {}
+
+def main():
+    """创建主窗口并进入事件循环"""
+    global root, output_dir, term_var, status_var, file_list, generate_button, cancel_button, progress_bar, status_label
+    
+    root = tk.Tk()
+    root.title("UBC Workday Excel课表转换器")
+    
+    output_dir = tk.StringVar()
+    term_var = tk.StringVar(value=default_registry().get('term1').id)
+    status_var = tk.StringVar()
+    
+    # 文件选择区（可加入多个文件排队转换）
+    file_frame = tk.Frame(root)
+    file_frame.grid(row=0, column=0, columnspan=3, pady=10, padx=10, sticky='w')
+    tk.Label(file_frame, text="选择Excel文件:").grid(row=0, column=0, padx=5, sticky='ne')
+    file_list = tk.Listbox(file_frame, width=50, height=4)
+    file_list.grid(row=0, column=1, padx=5)
+    file_buttons = tk.Frame(file_frame)
+    file_buttons.grid(row=0, column=2, padx=5, sticky='n')
+    tk.Button(file_buttons, text="浏览...", command=choose_file).grid(row=0, column=0, sticky='ew')
+    tk.Button(file_buttons, text="清空", command=clear_files).grid(row=1, column=0, sticky='ew')
+    
+    # 导出目录选择区
+    out_frame = tk.Frame(root)
+    out_frame.grid(row=1, column=0, columnspan=3, pady=10, padx=10, sticky='w')
+    tk.Label(out_frame, text="选择导出目录:").grid(row=0, column=0, padx=5, sticky='e')
+    tk.Entry(out_frame, textvariable=output_dir, width=50).grid(row=0, column=1, padx=5)
+    tk.Button(out_frame, text="浏览...", command=choose_directory).grid(row=0, column=2, padx=5)
+    
+    # 学期选择区
+    term_frame = tk.Frame(root)
+    term_frame.grid(row=2, column=0, columnspan=3, pady=10, padx=10, sticky='w')
+    tk.Label(term_frame, text="选择学期：").grid(row=0, column=0, padx=5)
+    for i, term in enumerate(default_registry().terms):
+        term_label = f"{term.name} ({term.start:%Y/%m/%d}-{term.end:%Y/%m/%d})"
+        tk.Radiobutton(term_frame, text=term_label, variable=term_var, value=term.id).grid(row=i // 2, column=i % 2 + 1, padx=5, sticky='w')
+    
+    # 生成与取消按钮
+    button_frame = tk.Frame(root)
+    button_frame.grid(row=3, column=0, columnspan=3, pady=20)
+    generate_button = tk.Button(button_frame, text="生成日历", command=generate_calendars, bg="#4CAF50", fg="white", padx=20, pady=5)
+    generate_button.grid(row=0, column=0, padx=10)
+    cancel_button = tk.Button(button_frame, text="取消", command=cancel_conversion, state=tk.DISABLED, padx=20, pady=5)
+    cancel_button.grid(row=0, column=1, padx=10)
+    
+    # 进度条与状态（初始隐藏）
+    progress_bar = ttk.Progressbar(root, orient='horizontal', mode='determinate', length=300, maximum=100)
+    status_label = tk.Label(root, textvariable=status_var)
+    
+    root.resizable(False, False)
+    root.mainloop()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+import hashlib
+import html
+import json
+import os
+import textwrap
+from pipeline_metrics import NULL_METRICS
+from atomic_files import write_atomic
+from calendar_layout import assign_lanes
+from xlsx_to_calendar import DEFAULT_TITLE, HTML_HEAD, assign_course_colors, _schedule_blocks
+
+DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
+
+# The full page's stylesheet without the per-course rules, which become inline colors
+CALENDAR_CSS = textwrap.dedent(HTML_HEAD.split('<style>', 1)[1]).strip() + '\n'
+
+# Lays out the page's meetings exactly like the full HTML page
+CALENDAR_JS = r"""(function () {
+  var DAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday'];
+  var data = JSON.parse(document.getElementById('meetings').textContent);
+  var root = document.getElementById('calendar');
+
+  function el(tag, className, text) {
+    var node = document.createElement(tag);
+    if (className) node.className = className;
+    if (text !== undefined) node.textContent = text;
+    return node;
+  }
+  function pad(n) { return (n < 10 ? '0' : '') + n; }
+  function clock(mins) { return pad(Math.floor(mins / 60)) + ':' + pad(mins % 60); }
+
+  var header = el('div', 'calendar-header');
+  header.appendChild(el('div', 'header-cell'));
+  DAYS.forEach(function (day) { header.appendChild(el('div', 'header-cell', day)); });
+
+  var container = el('div', 'calendar-container');
+  var times = el('div', 'time-column');
+  for (var hour = data.h[0]; hour <= data.h[1]; hour++) {
+    times.appendChild(el('div', 'time-slot', pad(hour) + ':00'));
+  }
+  container.appendChild(times);
+  var columns = DAYS.map(function () { return container.appendChild(el('div', 'day-column')); });
+
+  // Rows are [course, day, start, end, location, type(, lane, lanes)]
+  data.m.forEach(function (row) {
+    var course = data.c[row[0]], type = data.t[row[5]];
+    var block = el('div', 'course' + (type.toLowerCase() === 'laboratory' ? ' laboratory' : ''));
+    block.style.top = (row[2] - data.h[0] * 60) * (100 / 60) + 'px';
+    block.style.height = (row[3] - row[2]) * (100 / 60) + 'px';
+    block.style.backgroundColor = course[1];
+    if (row.length > 6) {
+      var width = 100 / row[7];
+      block.style.left = 'calc(' + row[6] * width + '% + 2px)';
+      block.style.width = 'max(calc(' + width + '% - 4px), 4px)';
+      block.style.right = 'auto';
+      block.style.boxSizing = 'border-box';
+    }
+    block.appendChild(el('div', 'course-type', type));
+    block.appendChild(el('div', 'time', clock(row[2]) + ' - ' + clock(row[3])));
+    block.appendChild(el('strong', '', course[0]));
+    block.appendChild(el('div', 'location', data.l[row[4]]));
+    columns[row[1]].appendChild(block);
+  });
+
+  root.appendChild(header);
+  root.appendChild(container);
+})();
+"""
+
+COMPACT_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="UTF-8">
+<title>{title}</title>
+<link rel="stylesheet" href="{css}">
+</head>
+<body>
+<h2>{title}</h2>
+<div id="calendar"></div>
+<script type="application/json" id="meetings">{data}</script>
+<script src="{js}"></script>
+</body>
+</html>
+"""
+
+def _asset(extension, content):
+    """(content-addressed file name, content), so assets can be cached indefinitely"""
+    return f"calendar.{hashlib.sha256(content.encode('utf-8')).hexdigest()[:10]}{extension}", content
+
+ASSETS = {'css': _asset('.css', CALENDAR_CSS), 'js': _asset('.js', CALENDAR_JS)}
+
+def write_assets(asset_dir):
+    """Write the shared stylesheet and renderer into asset_dir once
+    
+    Names include a content hash, so an existing file is already current
+    and pages can reference it with a far-future cache lifetime. Files are
+    written through a temporary name so parallel writers never expose a
+    partial asset. Returns the written (or existing) paths.
+    """
+    os.makedirs(asset_dir, exist_ok=True)
+    paths = []
+    for name, content in ASSETS.values():
+        path = os.path.join(asset_dir, name)
+        if not os.path.exists(path):
+            write_atomic(path, 'w', lambda f: f.write(content))
+        paths.append(path)
+    return paths
+
+def asset_prefix(page_dir, asset_dir):
+    """URL prefix leading from pages in page_dir to the assets in asset_dir"""
+    relative = os.path.relpath(asset_dir, page_dir).replace(os.sep, '/')
+    return '' if relative == '.' else relative + '/'
+
+def calendar_data(meetings):
+    """The compact JSON payload of a page
+    
+    Course names (with their color), locations and types are interned in
+    the c, l and t lists; each meeting in m is a row of integers
+    [course, day (0 = Monday), start, end, location, type], followed by
+    [lane, lanes] when it shares its time with other meetings. h holds the
+    first and last hour of the grid.
+    """
+    schedule, start_hour, end_hour = _schedule_blocks(meetings)
+    course_colors = assign_course_colors(meetings['course'])
+    tables = {'c': {}, 'l': {}, 't': {}}
+    
+    def intern(table, value):
+        return tables[table].setdefault(value, len(tables[table]))
+    
+    rows = []
+    for day_index, day in enumerate(DAYS):
+        intervals = [(block[0], block[1], block) for block in schedule[day]]
+        for placement in assign_lanes(intervals):
+            start_mins, end_mins, course_name, location, course_type = placement.item
+            row = [intern('c', course_name), day_index, int(start_mins), int(end_mins),
+                   intern('l', str(location)), intern('t', str(course_type))]
+            if placement.lanes > 1:
+                row += [placement.lane, placement.lanes]
+            rows.append(row)
+    
+    return {
+        'h': [start_hour, end_hour],
+        'c': [[str(course), course_colors[course]] for course in tables['c']],
+        'l': list(tables['l']),
+        't': list(tables['t']),
+        'm': rows,
+    }
+
+def generate_compact_calendar(meetings, prefix='', metrics=NULL_METRICS, title=DEFAULT_TITLE):
+    """Generate a compact HTML page that lays out its meetings client-side
+    
+    The page links the shared assets (see write_assets) under prefix.
+    """
+    with metrics.stage('html'):
+        data = json.dumps(calendar_data(meetings), ensure_ascii=False, separators=(',', ':'))
+        # Keep the payload from closing its script element
+        data = data.replace('<', '\\u003c')
+        return COMPACT_PAGE.format(css=prefix + ASSETS['css'][0], js=prefix + ASSETS['js'][0], data=data,
+                                   title=html.escape(title))
+
+def write_compact_calendar(meetings, f, prefix='', metrics=NULL_METRICS, title=DEFAULT_TITLE):
+    """Write the compact HTML page to a text file handle"""
+    f.write(generate_compact_calendar(meetings, prefix, metrics, title))
@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+from collections import Counter, namedtuple
+from datetime import datetime, timezone
+from atomic_files import write_atomic
+from ics_writer import TZID, fold_line, write_event, write_header
+
+# Bump when the layout of the state file changes
+STATE_VERSION = 1
+
+# events: every VEVENT of the full feed, delta: only what changed since the
+# previous publish (cancellations included), counts: added, changed,
+# unchanged and cancelled event totals
+Publication = namedtuple('Publication', ['events', 'delta', 'state', 'counts'])
+
+def empty_state():
+    """State of a feed that has never been published"""
+    return {'version': STATE_VERSION, 'events': {}}
+
+def load_state(path):
+    """Read the published-events state, or start empty if there is none"""
+    if not os.path.exists(path):
+        return empty_state()
+    with open(path, encoding='utf-8') as f:
+        state = json.load(f)
+    if state.get('version') != STATE_VERSION:
+        raise ValueError(f"{path} is not a publish state file of version {STATE_VERSION}")
+    return state
+
+def save_state(state, path):
+    """Write the state through a temporary file so a crash never truncates it"""
+    write_atomic(path, 'w', lambda f: json.dump(state, f, ensure_ascii=False, separators=(',', ':')))
+
+def event_digest(lines):
+    """Content hash of an event's property lines"""
+    return hashlib.sha1('\n'.join(lines).encode('utf-8')).hexdigest()
+
+def _versioned(lines, sequence, stamp, cancelled=False):
+    """Property lines with SEQUENCE and DTSTAMP after the UID
+    
+    lines come without a DTSTAMP (see plan_publication).
+    """
+    at = next(i for i, line in enumerate(lines) if line.startswith('UID:')) + 1
+    extra = [f'SEQUENCE:{sequence}', f'DTSTAMP:{stamp}', *(['STATUS:CANCELLED'] if cancelled else [])]
+    return lines[:at] + extra + lines[at:]
+
+def plan_publication(events, state, now=None):
+    """Compare (uid, lines) events with the previous publish
+    
+    New events start at SEQUENCE 0 and changed ones get the next
+    sequence; unchanged events keep theirs and their DTSTAMP, so an
+    unchanged schedule republishes byte for byte. Events that disappeared
+    are cancelled with a bumped sequence and kept in the state as
+    tombstones, so one that comes back continues from there.
+    """
+    stamp = (now or datetime.now(timezone.utc)).strftime('%Y%m%dT%H%M%SZ')
+    previous = state['events']
+    entries = {}
+    published, delta = [], []
+    counts = Counter(added=0, changed=0, unchanged=0, cancelled=0)
+    
+    for uid, lines in events:
+        # The generator's fixed DTSTAMP gives way to the time of publishing
+        lines = [line for line in lines if not line.startswith('DTSTAMP:')]
+        digest = event_digest(lines)
+        entry = previous.get(uid)
+        if entry and not entry.get('cancelled') and entry['digest'] == digest:
+            status = 'unchanged'
+        else:
+            status = 'changed' if entry else 'added'
+            entry = {'digest': digest, 'sequence': entry['sequence'] + 1 if entry else 0,
+                     'stamp': stamp, 'lines': lines}
+        counts[status] += 1
+        entries[uid] = entry
+        versioned = _versioned(lines, entry['sequence'], entry['stamp'])
+        published.append(versioned)
+        if status != 'unchanged':
+            delta.append(versioned)
+    
+    for uid, entry in previous.items():
+        if uid in entries:
+            continue
+        if not entry.get('cancelled'):
+            entry = {**entry, 'sequence': entry['sequence'] + 1, 'stamp': stamp, 'cancelled': True}
+            delta.append(_versioned(entry['lines'], entry['sequence'], stamp, cancelled=True))
+            counts['cancelled'] += 1
+        entries[uid] = entry
+    
+    return Publication(published, delta, {'version': STATE_VERSION, 'events': entries}, counts)
+
+def write_feed(f, events, tzid=TZID):
+    """Write a VCALENDAR of versioned event lines to a binary file handle"""
+    write_header(f, tzid)
+    for lines in events:
+        write_event(f, lines)
+    f.write(fold_line('END:VCALENDAR'))
+
+def publish(events, out_file, state_file, delta_file=None, now=None):
+    """Publish events as a full feed, and optionally a delta-only feed
+    
+    The state file records what was published so the next run can tell
+    what changed; it is only updated once the feeds are written. Returns
+    the added, changed, unchanged and cancelled counts.
+    """
+    publication = plan_publication(events, load_state(state_file), now)
+    outputs = [(out_file, publication.events)] + ([(delta_file, publication.delta)] if delta_file else [])
+    for path, feed in outputs:
+        write_atomic(path, 'wb', lambda f: write_feed(f, feed))
+    save_state(publication.state, state_file)
+    return publication.counts
@@ -0,0 +1,180 @@
+import hashlib
+from datetime import datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+from time_parsing import format_minutes, parse_date
+
+TZID = 'America/Vancouver'
+PRODID = '-//Course Schedule Calendar//mxm.dk//'
+DAY_NUMBERS = {'Mon': 0, 'Tue': 1, 'Wed': 2, 'Thu': 3, 'Fri': 4}
+
+# DTSTAMP of every generated event: a fixed constant rather than the time
+# of the run, so the same input always gives the same bytes and cached
+# calendars stay valid. Published feeds replace it with the publish time
+# (see ics_publish), which is what subscribers compare.
+DTSTAMP = datetime(2026, 10, 16, tzinfo=timezone.utc)
+
+VTIMEZONE = [
+    'BEGIN:VTIMEZONE',
+    f'TZID:{TZID}',
+    'BEGIN:DAYLIGHT',
+    'TZOFFSETFROM:-0800',
+    'TZOFFSETTO:-0700',
+    'TZNAME:PDT',
+    'DTSTART:19700308T020000',
+    'RRULE:FREQ=YEARLY;BYMONTH=3;BYDAY=2SU',
+    'END:DAYLIGHT',
+    'BEGIN:STANDARD',
+    'TZOFFSETFROM:-0700',
+    'TZOFFSETTO:-0800',
+    'TZNAME:PST',
+    'DTSTART:19701101T020000',
+    'RRULE:FREQ=YEARLY;BYMONTH=11;BYDAY=1SU',
+    'END:STANDARD',
+    'END:VTIMEZONE',
+]
+
+def event_key(section, day, start_time, location):
+    """Identity of a weekly meeting, used for de-duplication"""
+    return f"{section}_{day}_{start_time}_{location}"
+
+def event_uid(key):
+    """Stable UID derived from an event key"""
+    return hashlib.sha1(key.encode('utf-8')).hexdigest() + '@xlsx-to-calendar'
+
+def escape_text(value):
+    """Escape a TEXT value (RFC 5545 section 3.3.11)"""
+    return (str(value).replace('\\', '\\\\').replace(';', '\\;')
+            .replace(',', '\\,').replace('\r\n', '\\n').replace('\n', '\\n'))
+
+def fold_line(line):
+    """Encode a content line, folding it at 75 octets without splitting characters"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return encoded + b'\r\n'
+    
+    chunks = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        # Step back off UTF-8 continuation bytes
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        chunks.append(encoded[:cut])
+        encoded = encoded[cut:]
+        limit = 74  # Continuation lines start with a space
+    return b'\r\n '.join(chunks) + b'\r\n'
+
+def format_local(value):
+    """Format a naive local datetime as an iCalendar DATE-TIME"""
+    return value.strftime('%Y%m%dT%H%M%S')
+
+def format_utc(value, tz):
+    """Format a naive local datetime as a UTC DATE-TIME"""
+    return value.replace(tzinfo=tz).astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+def write_header(f, tzid=TZID):
+    """Write the VCALENDAR header, with the VTIMEZONE of the default zone"""
+    header = ['BEGIN:VCALENDAR', 'VERSION:2.0', f'PRODID:{PRODID}']
+    if tzid == TZID:
+        header += VTIMEZONE
+    f.write(b''.join(fold_line(line) for line in header))
+
+def write_event(f, lines):
+    """Write one VEVENT from its property lines"""
+    f.write(b''.join(fold_line(line) for line in ['BEGIN:VEVENT', *lines, 'END:VEVENT']))
+
+def write_calendar(f, meetings, term_end, tzid=TZID, metrics=None, occurrences=None, expand=False, stamp=DTSTAMP):
+    """Stream a VCALENDAR for meeting records to a binary file handle
+    
+    See iter_events for the arguments. metrics, if given, also receives a
+    per-event 'events_written' count. Returns the number of events written.
+    """
+    write_header(f, tzid)
+    count = 0
+    for _, lines in iter_events(meetings, term_end, tzid, metrics, occurrences, expand, stamp):
+        write_event(f, lines)
+        count += 1
+        if metrics:
+            metrics.count('events_written')
+    f.write(fold_line('END:VCALENDAR'))
+    return count
+
+def iter_events(meetings, term_end, tzid=TZID, metrics=None, occurrences=None, expand=False, stamp=DTSTAMP):
+    """Yield (uid, property lines) for each VEVENT of the meeting records
+    
+    meetings yields objects with section, format, instructor, day,
+    start_mins, end_mins, start_date and location attributes (for example
+    DataFrame.itertuples). term_end is a 'YYYY/MM/DD' string. metrics,
+    if given, receives 'duplicate_events' counts.
+    
+    By default each meeting repeats weekly from its start date until
+    term_end. occurrences, if given, runs parallel to meetings with a
+    (dates, excluded dates) pair per meeting (see occurrences.py): the
+    RRULE then ends on the last date and excluded dates become EXDATEs, or
+    with expand=True every date is its own event and excluded dates are
+    left out.
+    
+    Every event carries stamp, a UTC datetime, as its DTSTAMP.
+    """
+    tz = ZoneInfo(tzid)
+    dtstamp = stamp.strftime('%Y%m%dT%H%M%SZ')
+    until = datetime.combine(parse_date(term_end), time(), tzinfo=tz).astimezone(timezone.utc)
+    until = until.strftime('%Y%m%dT%H%M%SZ')
+    
+    # Track added events to avoid duplicates
+    added_events = set()
+    
+    occurrences = iter(occurrences) if occurrences is not None else None
+    for meeting in meetings:
+        dates, excluded = next(occurrences) if occurrences is not None else (None, None)
+        day_num = DAY_NUMBERS.get(meeting.day)
+        if day_num is None:
+            continue
+        
+        start_time = format_minutes(meeting.start_mins)
+        key = event_key(meeting.section, meeting.day, start_time, meeting.location)
+        if key in added_events:
+            if metrics:
+                metrics.count('duplicate_events')
+            continue
+        added_events.add(key)
+        
+        description = (
+            f"Section: {meeting.section}\n"
+            f"Type: {meeting.format}\n"
+            f"Location: {meeting.location}\n"
+            f"Instructor: {meeting.instructor}"
+        )
+        
+        details = [f'DESCRIPTION:{escape_text(description)}', f'LOCATION:{escape_text(meeting.location)}']
+        start_offset = timedelta(minutes=int(meeting.start_mins))
+        end_offset = timedelta(minutes=int(meeting.end_mins))
+        
+        if occurrences is None:
+            # First occurrence of the meeting's weekday on or after its start date
+            first_date = meeting.start_date + timedelta(days=(day_num - meeting.start_date.weekday()) % 7)
+            instances = [(first_date, event_uid(key), [f'RRULE:FREQ=WEEKLY;UNTIL={until};BYDAY={meeting.day[:2].upper()}'])]
+        elif expand:
+            instances = [(day, event_uid(f"{key}_{day:%Y%m%d}"), []) for day in dates]
+        else:
+            every = sorted(dates + excluded)
+            if not every:
+                continue
+            last = datetime.combine(every[-1], time()) + start_offset
+            rules = [f'RRULE:FREQ=WEEKLY;UNTIL={format_utc(last, tz)};BYDAY={meeting.day[:2].upper()}']
+            if excluded:
+                exdates = ','.join(format_local(datetime.combine(day, time()) + start_offset) for day in excluded)
+                rules.append(f'EXDATE;TZID={tzid}:{exdates}')
+            instances = [(every[0], event_uid(key), rules)]
+        
+        for day, uid, rules in instances:
+            midnight = datetime.combine(day, time())
+            yield uid, [
+                f'SUMMARY:{escape_text(meeting.section)}',
+                f'DTSTART;TZID={tzid}:{format_local(midnight + start_offset)}',
+                f'DTEND;TZID={tzid}:{format_local(midnight + end_offset)}',
+                f'UID:{uid}',
+                f'DTSTAMP:{dtstamp}',
+                *rules,
+                *details,
+            ]
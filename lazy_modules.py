@@ -0,0 +1,27 @@
+import importlib
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access"""
+    
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+    
+    def _load(self):
+        """Import the real module once"""
+        if self._module is None:
+            self.__dict__['_module'] = importlib.import_module(self._name)
+        return self._module
+    
+    def __getattr__(self, attr):
+        """Forward attribute lookups to the real module"""
+        return getattr(self._load(), attr)
+    
+    def __repr__(self):
+        """Show whether the import has happened yet"""
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<lazy module '{self._name}' ({state})>"
+
+def lazy_import(name):
+    """Defer importing a heavy dependency until it is actually used"""
+    return LazyModule(name)
@@ -0,0 +1,157 @@
+import io
+import json
+import logging
+import os
+import xlsx_to_calendar
+from atomic_files import write_atomic
+from term_registry import default_registry
+from xlsx_to_calendar import MEETING_COLUMNS, compact_meeting_table, pd
+
+logger = logging.getLogger('xlsx_to_calendar')
+
+# Bump when columns or their types change
+SCHEMA_VERSION = '1'
+
+EXTENSIONS = {'.parquet': 'parquet', '.arrow': 'arrow', '.feather': 'arrow', '.jsonl': 'jsonl'}
+TEXT_COLUMNS = ['section', 'course', 'format', 'instructor', 'day', 'location']
+DATE_COLUMNS = ['start_date', 'end_date']
+MINUTE_COLUMNS = ['start_mins', 'end_mins']
+
+def export_format(path):
+    """Export format implied by a file extension"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in EXTENSIONS:
+        raise ValueError(f"Unsupported export extension '{extension}' (use {', '.join(EXTENSIONS)})")
+    return EXTENSIONS[extension]
+
+def schema_metadata():
+    """Version fields stored with every export, in the Arrow schema or the JSONL header"""
+    return {'schema_version': SCHEMA_VERSION, 'generator_version': xlsx_to_calendar.GENERATOR_VERSION}
+
+def arrow_schema():
+    """The fixed Arrow schema of an exported meeting table
+    
+    Text columns are dictionary-encoded like the table's categoricals,
+    minutes are int16 and dates are date32 (end_date may be null).
+    """
+    import pyarrow as pa
+    
+    types = {
+        **{column: pa.dictionary(pa.int32(), pa.string()) for column in TEXT_COLUMNS},
+        **{column: pa.int16() for column in MINUTE_COLUMNS},
+        **{column: pa.date32() for column in DATE_COLUMNS},
+    }
+    return pa.schema([(column, types[column]) for column in MEETING_COLUMNS], metadata=schema_metadata())
+
+def _date_days(column):
+    """A date column as datetime64[D], missing dates as NaT"""
+    return pd.to_datetime(column).to_numpy().astype('datetime64[D]')
+
+def to_arrow(meetings):
+    """Convert a meeting table to a pyarrow Table with arrow_schema()"""
+    import pyarrow as pa
+    
+    meetings = compact_meeting_table(meetings)
+    arrays = []
+    for column in MEETING_COLUMNS:
+        values = meetings[column]
+        if column in TEXT_COLUMNS:
+            # Reuse the categorical codes as dictionary indices
+            codes = values.cat.codes.to_numpy().astype('int32')
+            indices = pa.array(codes, type=pa.int32(), mask=codes < 0)
+            dictionary = pa.array([str(value) for value in values.cat.categories], type=pa.string())
+            arrays.append(pa.DictionaryArray.from_arrays(indices, dictionary))
+        elif column in DATE_COLUMNS:
+            arrays.append(pa.array(_date_days(values), type=pa.date32(), from_pandas=True))
+        else:
+            arrays.append(pa.array(values.to_numpy(dtype='int16'), type=pa.int16()))
+    return pa.Table.from_arrays(arrays, schema=arrow_schema())
+
+def _write_jsonl(meetings, f):
+    """A header line with schema_metadata() and the columns, then one JSON object per meeting
+    
+    Dates are written as ISO strings.
+    """
+    f.write(json.dumps({**schema_metadata(), 'columns': MEETING_COLUMNS}) + '\n')
+    for row in meetings.itertuples(index=False):
+        record = dict(zip(MEETING_COLUMNS, row))
+        for column in DATE_COLUMNS:
+            value = record[column]
+            record[column] = value.isoformat() if pd.notna(value) else None
+        for column in MINUTE_COLUMNS:
+            record[column] = int(record[column])
+        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+def jsonl_bytes(meetings):
+    """A meeting table encoded as a JSONL export, for callers that store bytes"""
+    f = io.StringIO()
+    _write_jsonl(meetings, f)
+    return f.getvalue().encode('utf-8')
+
+def _write_arrow(table, f):
+    """A pyarrow Table as an Arrow IPC file"""
+    import pyarrow as pa
+    
+    with pa.ipc.new_file(f, table.schema) as writer:
+        writer.write_table(table)
+
+def write_meetings(meetings, path):
+    """Export a meeting table to Parquet, Arrow IPC or JSONL by extension
+    
+    Parquet and Arrow need pyarrow; without it the table is written as
+    JSONL next to the requested path instead. Returns the path written.
+    """
+    kind = export_format(path)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    if kind != 'jsonl':
+        try:
+            table = to_arrow(meetings)
+        except ImportError:
+            fallback = os.path.splitext(path)[0] + '.jsonl'
+            logger.warning("pyarrow is not installed; writing %s instead of %s", fallback, path)
+            path, kind = fallback, 'jsonl'
+    
+    # Readers never see a partial export
+    if kind == 'parquet':
+        import pyarrow.parquet as pq
+        write_atomic(path, 'wb', lambda f: pq.write_table(table, f))
+    elif kind == 'arrow':
+        write_atomic(path, 'wb', lambda f: _write_arrow(table, f))
+    else:
+        write_atomic(path, 'w', lambda f: _write_jsonl(meetings, f))
+    return path
+
+def _check_schema(version, columns, path):
+    """Reject files written with a different schema"""
+    if version != SCHEMA_VERSION or columns != MEETING_COLUMNS:
+        raise ValueError(f"{path} does not contain a meeting table with schema version {SCHEMA_VERSION}")
+
+def read_meetings(path):
+    """Load an exported meeting table, ready for the HTML and ICS generators"""
+    kind = export_format(path)
+    if kind == 'jsonl':
+        with open(path, encoding='utf-8') as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        header = records.pop(0) if records else {}
+        _check_schema(header.get('schema_version'), header.get('columns'), path)
+        meetings = pd.DataFrame.from_records(records, columns=MEETING_COLUMNS)
+        for column in DATE_COLUMNS:
+            meetings[column] = pd.to_datetime(meetings[column], format='%Y-%m-%d').dt.date
+    else:
+        if kind == 'parquet':
+            import pyarrow.parquet as pq
+            table = pq.read_table(path)
+        else:
+            import pyarrow as pa
+            with pa.memory_map(path) as source:
+                table = pa.ipc.open_file(source).read_all()
+        _check_schema((table.schema.metadata or {}).get(b'schema_version', b'').decode(), table.schema.names, path)
+        meetings = table.to_pandas(date_as_object=True)
+    
+    return compact_meeting_table(meetings.astype({column: 'int16' for column in MINUTE_COLUMNS}))
+
+def read_term_meetings(path, term):
+    """read_meetings narrowed to the meetings of one term, as exports may hold every term"""
+    term_id = default_registry().get(term).id
+    meetings = read_meetings(path)
+    return xlsx_to_calendar.partition_by_term(meetings).get(term_id, meetings.head(0))
@@ -0,0 +1,53 @@
+import numpy as np
+
+# Any Monday works as the origin for weekday arithmetic on datetime64[D]
+MONDAY = np.datetime64('1970-01-05', 'D')
+
+def weekday(days):
+    """Weekday (0 = Monday) of each datetime64[D] value"""
+    return (days - MONDAY).astype('int64') % 7
+
+def first_occurrences(start_days, weekdays):
+    """First date on or after each start date that falls on its weekday"""
+    return start_days + (weekdays - weekday(start_days)) % 7
+
+def holiday_dates(registry):
+    """Every excluded day of every term in the registry, as datetime64[D]"""
+    ranges = [np.arange(np.datetime64(e.start, 'D'), np.datetime64(e.end, 'D') + 1)
+              for term in registry.terms for e in term.exclusions]
+    return np.unique(np.concatenate(ranges)) if ranges else np.array([], dtype='datetime64[D]')
+
+def expand_weekly(start_days, end_days, weekdays, holidays=()):
+    """Every weekly occurrence of each meeting, without a Python loop per meeting
+    
+    start_days and end_days are datetime64[D] arrays bounding each meeting
+    (inclusive; NaT yields no occurrences) and weekdays its day, 0 = Monday.
+    Returns (meeting index, date, excluded) arrays sorted by meeting then
+    date, where excluded marks dates listed in holidays.
+    """
+    start_days = np.asarray(start_days, dtype='datetime64[D]')
+    end_days = np.asarray(end_days, dtype='datetime64[D]')
+    first = first_occurrences(start_days, np.asarray(weekdays, dtype='int64'))
+    
+    # NaT compares false, so meetings without a valid range expand to nothing
+    valid = end_days >= first
+    counts = np.zeros(len(first), dtype='int64')
+    counts[valid] = (end_days[valid] - first[valid]).astype('int64') // 7 + 1
+    
+    index = np.repeat(np.arange(len(first)), counts)
+    weeks = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    dates = first[index] + weeks * 7
+    excluded = ~np.is_busday(dates, weekmask='1111111', holidays=np.asarray(holidays, dtype='datetime64[D]'))
+    return index, dates, excluded
+
+def group_occurrences(count, index, dates, excluded):
+    """Split expand_weekly's output into one (dates, excluded dates) pair per meeting
+    
+    Dates are returned as datetime.date lists.
+    """
+    bounds = np.searchsorted(index, np.arange(count + 1))
+    as_dates = dates.astype(object)
+    return [
+        (list(as_dates[start:end][~excluded[start:end]]), list(as_dates[start:end][excluded[start:end]]))
+        for start, end in zip(bounds[:-1], bounds[1:])
+    ]
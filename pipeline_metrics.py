@@ -0,0 +1,123 @@
+import json
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+
+class PipelineMetrics:
+    """Per-stage timings, allocation stats and counters for one conversion
+    
+    With track_allocations, each stage also records tracemalloc's peak
+    and the bytes still allocated when it finished (retained_bytes).
+    
+    Hooks are called as hook(kind, name, value) where kind is 'stage'
+    (value is the stage's stats dict) or 'count' (value is the increment).
+    """
+    
+    def __init__(self, track_allocations=False, hooks=()):
+        self.track_allocations = track_allocations
+        self.stages = {}
+        self.counters = Counter()
+        self.hooks = list(hooks)
+    
+    def add_hook(self, hook):
+        """Register a hook(kind, name, value) callback"""
+        self.hooks.append(hook)
+    
+    def _emit(self, kind, name, value):
+        """Call every hook"""
+        for hook in self.hooks:
+            hook(kind, name, value)
+    
+    @contextmanager
+    def stage(self, name):
+        """Time a block; repeated stages accumulate"""
+        tracing = self.track_allocations and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            stats = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0})
+            stats['seconds'] += time.perf_counter() - started
+            stats['calls'] += 1
+            if tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                stats['retained_bytes'] = stats.get('retained_bytes', 0) + current
+                stats['peak_bytes'] = max(stats.get('peak_bytes', 0), peak)
+            self._emit('stage', name, stats)
+    
+    def count(self, name, n=1):
+        """Increment a counter"""
+        self.counters[name] += n
+        self._emit('count', name, n)
+    
+    def merge(self, other):
+        """Add another run's numbers (a PipelineMetrics or its to_dict())"""
+        data = other.to_dict() if isinstance(other, PipelineMetrics) else other
+        for name, stats in data['stages'].items():
+            mine = self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0})
+            mine['seconds'] += stats['seconds']
+            mine['calls'] += stats['calls']
+            if 'retained_bytes' in stats:
+                mine['retained_bytes'] = mine.get('retained_bytes', 0) + stats['retained_bytes']
+                mine['peak_bytes'] = max(mine.get('peak_bytes', 0), stats['peak_bytes'])
+        self.counters.update(data['counters'])
+    
+    def to_dict(self):
+        """JSON-serializable snapshot"""
+        return {'stages': {name: dict(stats) for name, stats in self.stages.items()},
+                'counters': dict(self.counters)}
+    
+    def write_json(self, path, **extra):
+        """Write the snapshot, plus any extra top-level fields, to path"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({**self.to_dict(), **extra}, f, indent=2)
+
+class NullMetrics:
+    """Stand-in used when the caller does not collect metrics"""
+    
+    @contextmanager
+    def stage(self, name):
+        """No-op stage"""
+        yield
+    
+    def count(self, name, n=1):
+        """No-op counter"""
+        pass
+
+NULL_METRICS = NullMetrics()
+
+@contextmanager
+def profile(path, profiler='cprofile'):
+    """Profile a block and save the result to path
+    
+    cprofile writes pstats data; pyinstrument (if installed) writes HTML.
+    Does nothing when path is None.
+    """
+    if not path:
+        yield
+        return
+    
+    if profiler == 'pyinstrument':
+        from pyinstrument import Profiler
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(profiler.output_html())
+        return
+    
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
@@ -0,0 +1,132 @@
+import logging
+import re
+from collections import namedtuple
+from pipeline_metrics import NULL_METRICS
+from term_registry import default_registry
+from time_parsing import format_minutes, is_twelve_hour, parse_clock, parse_date
+
+logger = logging.getLogger('xlsx_to_calendar')
+
+MEETING_COLUMNS = [
+    'section', 'course', 'format', 'instructor', 'day',
+    'start_mins', 'end_mins', 'start_date', 'end_date', 'location'
+]
+
+# One meeting day of a section, mirroring a row of the meeting table
+Meeting = namedtuple('Meeting', MEETING_COLUMNS)
+
+# One meeting day of a pattern block: dates stay as 'YYYY-MM-DD' text,
+# times are minutes since midnight. Tuples carry no per-instance dict.
+MeetingSlot = namedtuple('MeetingSlot', ['start_date', 'end_date', 'day', 'start_mins', 'end_mins', 'location'])
+
+def parse_meeting_pattern(pattern, metrics=NULL_METRICS):
+    """Parse the complete meeting pattern including dates, times, and location"""
+    return [
+        {
+            'start_date': slot.start_date,
+            'end_date': slot.end_date,
+            'day': slot.day,
+            'start_time': format_minutes(slot.start_mins),
+            'end_time': format_minutes(slot.end_mins),
+            'location': slot.location
+        }
+        for slot in parse_meeting_slots(pattern, metrics)
+    ]
+
+def parse_meeting_slots(pattern, metrics=NULL_METRICS):
+    """Parse a meeting pattern cell into MeetingSlots, one per meeting day"""
+    if not isinstance(pattern, str):
+        return []
+    
+    try:
+        # Split into blocks and clean them
+        blocks = [block.strip() for block in pattern.split('\n\n') if block.strip()]
+        results = []
+        
+        for block in blocks:
+            try:
+                # Split the single line into parts using |
+                parts = [p.strip() for p in block.split('|') if p.strip()]
+                if len(parts) < 3:
+                    metrics.count('skipped_blocks')
+                    continue
+                
+                # Parse date range
+                date_range = parts[0]
+                date_parts = re.split(r'[/-]', date_range)  # Support '/' or '-' as separators
+                start_date = '-'.join(date_parts[:3]).strip()
+                end_date = '-'.join(date_parts[3:]).strip()
+                
+                # Parse days and times
+                day_time = parts[1]
+                days = day_time.split()  # Split into individual days
+                
+                time_parts = parts[2].strip().split('-')
+                if len(time_parts) != 2:
+                    metrics.count('skipped_blocks')
+                    continue
+                
+                # Detect time format from the start time and parse both ends
+                twelve_hour = is_twelve_hour(time_parts[0])
+                start_mins = parse_clock(time_parts[0], twelve_hour)
+                end_mins = parse_clock(time_parts[1], twelve_hour)
+                
+                # Get location
+                location = parts[3].strip() if len(parts) > 3 else ""
+                
+                # Add each day to results
+                for day in days:
+                    results.append(MeetingSlot(start_date, end_date, day, start_mins, end_mins, location))
+            
+            except Exception as block_error:
+                logger.warning("Error processing block: %s", block_error)
+                metrics.count('parse_failures')
+                continue
+        
+        return results
+    
+    except Exception as e:
+        logger.warning("Error in parse_meeting_pattern: %s", e)
+        metrics.count('parse_failures')
+        return []
+
+def _text(value):
+    """Cell value as text, with empty cells as ''"""
+    return '' if value is None else str(value)
+
+def iter_meetings(rows, selected_term=None, metrics=NULL_METRICS):
+    """Yield Meeting records from row dicts without pandas
+    
+    rows are dicts keyed by the export's column names (see
+    xlsx_to_calendar.iter_excel_rows). Meetings whose start date is not
+    in selected_term are skipped when a term is given.
+    """
+    term = default_registry().get(selected_term) if selected_term else None
+    
+    for row in rows:
+        metrics.count('rows')
+        for slot in parse_meeting_slots(row.get('Meeting Patterns'), metrics):
+            try:
+                start_date = parse_date(slot.start_date)
+            except ValueError:
+                continue
+            if term and not term.start <= start_date <= term.end:
+                continue
+            try:
+                end_date = parse_date(slot.end_date)
+            except ValueError:
+                end_date = None
+            
+            metrics.count('meetings')
+            yield Meeting(
+                section=_text(row.get('Section')),
+                course=_text(row.get('Course Listing')),
+                format=_text(row.get('Instructional Format')),
+                instructor=_text(row.get('Instructor')),
+                day=slot.day,
+                start_mins=slot.start_mins,
+                end_mins=slot.end_mins,
+                start_date=start_date,
+                end_date=end_date,
+                location=slot.location
+            )
@@ -0,0 +1,144 @@
+import html
+import os
+from concurrent.futures import ProcessPoolExecutor
+from atomic_files import write_atomic
+from datetime import timedelta
+from pipeline_metrics import NULL_METRICS
+from term_registry import default_registry
+import xlsx_to_calendar
+from xlsx_to_calendar import np, occurrences, pd
+from aggregation import build_indexes, unique_stem
+
+# Index field -> site subdirectory of its per-value pages
+SITE_VIEWS = {'course': 'courses', 'location': 'rooms'}
+
+# Pages handed to a worker per task: enough to amortize the round trip,
+# few enough to keep every worker busy
+BATCH_SIZE = 64
+
+SITE_INDEX = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="UTF-8">
+<title>{title}</title>
+<style>
+body {{ font-family: system-ui, -apple-system, sans-serif; padding: 20px; background-color: #f5f5f5; }}
+ul {{ columns: 3; }}
+</style>
+</head>
+<body>
+<h2>{title}</h2>
+{sections}
+</body>
+</html>
+"""
+
+# Set in each worker process by _init_worker
+_worker_meetings = None
+
+def week_rows(meetings, term_end):
+    """{Monday of each week: row positions of the meetings held that week}
+    
+    A meeting belongs to every week in which one of its weekly classes
+    falls between its own start and end dates; classes on holidays and
+    breaks do not count, so a week off is left out entirely.
+    """
+    index, dates, excluded = xlsx_to_calendar.expand_meeting_dates(meetings, term_end)
+    index, dates = index[~excluded], dates[~excluded]
+    mondays = dates - occurrences.weekday(dates)
+    groups = pd.Series(mondays).groupby(mondays).indices
+    return {week.date(): np.unique(index[positions]) for week, positions in sorted(groups.items())}
+
+def plan_pages(meetings, term_end):
+    """Every page of the site as (relative path, title, row positions)"""
+    pages = []
+    for monday, rows in week_rows(meetings, term_end).items():
+        friday = monday + timedelta(days=4)
+        title = f"Week of {monday:%b} {monday.day} - {friday:%b} {friday.day}, {friday.year}"
+        pages.append((f"weeks/{monday:%Y-%m-%d}.html", title, rows))
+    
+    for field, index in build_indexes(meetings, tuple(SITE_VIEWS)).items():
+        stems = set()
+        for value, rows in index.items():
+            pages.append((f"{SITE_VIEWS[field]}/{unique_stem(value, stems)}.html", str(value), rows))
+    return pages
+
+def _init_worker(meetings):
+    """Keep the meeting table in the worker for _write_pages"""
+    global _worker_meetings
+    _worker_meetings = meetings
+
+def _write_pages(out_dir, pages, html_mode, meetings=None):
+    """Render a batch of pages, each written to a temporary file and renamed into place
+    
+    Runs in a worker, where the meeting table was installed once by
+    _init_worker, so a task only carries row positions.
+    """
+    meetings = _worker_meetings if meetings is None else meetings
+    if html_mode == 'compact':
+        import html_compact
+    
+    for path, title, rows in pages:
+        page, path = meetings.iloc[rows], os.path.join(out_dir, path)
+        if html_mode == 'compact':
+            write_atomic(path, 'w', lambda f: html_compact.write_compact_calendar(page, f, '../', title=title))
+        else:
+            write_atomic(path, 'w', lambda f: xlsx_to_calendar.write_course_calendar(page, f, title=title))
+    return len(pages)
+
+def write_index(out_dir, pages, title):
+    """index.html linking every page, grouped by section"""
+    sections = []
+    for directory, heading in [('weeks', 'Weeks'), *((view, view.capitalize()) for view in SITE_VIEWS.values())]:
+        links = ''.join(f'<li><a href="{html.escape(path)}">{html.escape(page_title)}</a></li>\n'
+                        for path, page_title, _ in pages if path.startswith(directory + '/'))
+        if links:
+            sections.append(f'<h3>{heading}</h3>\n<ul>\n{links}</ul>')
+    
+    page = SITE_INDEX.format(title=html.escape(title), sections='\n'.join(sections))
+    write_atomic(os.path.join(out_dir, 'index.html'), 'w', lambda f: f.write(page))
+
+def remove_stale(out_dir, pages):
+    """Delete pages left over from an earlier build"""
+    current = {os.path.normpath(os.path.join(out_dir, path)) for path, _, _ in pages}
+    for directory in ['weeks', *SITE_VIEWS.values()]:
+        directory = os.path.join(out_dir, directory)
+        for name in os.listdir(directory):
+            path = os.path.normpath(os.path.join(directory, name))
+            if name.endswith('.html') and path not in current:
+                os.remove(path)
+
+def generate_site(meetings, out_dir, term, jobs=None, html_mode='full', metrics=NULL_METRICS):
+    """Write a browsable static site for one parsed schedule
+    
+    out_dir receives weeks/<Monday>.html with the classes actually held
+    each week, courses/<course>.html and rooms/<room>.html, and an
+    index.html linking them all. With jobs > 1 pages render in a process
+    pool, BATCH_SIZE per task. Every file is written to a temporary name
+    and renamed, so a browser or sync job never sees half a page. Returns
+    the number of pages written.
+    """
+    term_info = default_registry().get(term)
+    term_end = xlsx_to_calendar.get_term_dates(term)[1]
+    with metrics.stage('filter'):
+        pages = plan_pages(meetings, term_end)
+    
+    for directory in ['weeks', *SITE_VIEWS.values()]:
+        os.makedirs(os.path.join(out_dir, directory), exist_ok=True)
+    if html_mode == 'compact':
+        import html_compact
+        html_compact.write_assets(out_dir)
+    
+    batches = [pages[i:i + BATCH_SIZE] for i in range(0, len(pages), BATCH_SIZE)]
+    with metrics.stage('html'):
+        if jobs and jobs > 1 and len(batches) > 1:
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(meetings,)) as executor:
+                written = sum(executor.map(_write_pages, [out_dir] * len(batches), batches,
+                                           [html_mode] * len(batches)))
+        else:
+            written = sum(_write_pages(out_dir, batch, html_mode, meetings) for batch in batches)
+        write_index(out_dir, pages, f"{term_info.name} Course Schedule")
+    
+    remove_stale(out_dir, pages)
+    metrics.count('pages', written)
+    return written
@@ -0,0 +1,160 @@
+import codecs
+import csv
+import io
+import logging
+import os
+from lazy_modules import lazy_import
+
+pd = lazy_import('pandas')
+openpyxl = lazy_import('openpyxl')
+
+logger = logging.getLogger('xlsx_to_calendar')
+
+# Workday exports have two title rows above the column header
+HEADER_ROW = 2
+
+# Export columns the meeting table is built from
+SOURCE_COLUMNS = ['Course Listing', 'Section', 'Meeting Patterns', 'Instructional Format', 'Instructor']
+
+INPUT_EXTENSIONS = ('.xlsx', '.xls', '.csv', '.tsv')
+
+XLSX_MAGIC = b'PK\x03\x04'  # Zip container
+XLS_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'  # OLE2 compound file
+
+# Enough text to find the header row and the delimiter
+SNIFF_CHARS = 64 * 1024
+
+def _head(source, size):
+    """First size bytes of a path or binary file object, leaving its position unchanged"""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            return f.read(size)
+    position = source.tell()
+    data = source.read(size)
+    source.seek(position)
+    return data
+
+def _head_text(source):
+    """Decoded start of a text export; a partial trailing character is dropped"""
+    return codecs.getincrementaldecoder('utf-8-sig')(errors='replace').decode(_head(source, SNIFF_CHARS))
+
+def sniff_format(source):
+    """'xlsx', 'xls', 'csv' or 'tsv', judged by content rather than file name"""
+    magic = _head(source, len(XLS_MAGIC))
+    if magic.startswith(XLSX_MAGIC):
+        return 'xlsx'
+    if magic == XLS_MAGIC:
+        return 'xls'
+    header = _text_header(_head_text(source), None)[1]
+    return 'tsv' if header.count('\t') > header.count(',') else 'csv'
+
+def _text_header(text, delimiter):
+    """(offset, line) of the header in a CSV or TSV export
+    
+    Exports keep Workday's title rows, but a file whose first line is the
+    header is accepted too. Falls back to HEADER_ROW.
+    """
+    lines = text.splitlines()[:HEADER_ROW + 1]
+    for offset, line in enumerate(lines):
+        cells = line.split(delimiter) if delimiter else line.replace('\t', ',').split(',')
+        if any(cell.strip().strip('"') in SOURCE_COLUMNS for cell in cells):
+            return offset, line
+    return HEADER_ROW, lines[HEADER_ROW] if len(lines) > HEADER_ROW else ''
+
+def normalize_columns(df):
+    """Trim header names and drop blank rows, the same for every reader"""
+    df.columns = [name.strip() if isinstance(name, str) else name for name in df.columns]
+    return df.dropna(how='all')
+
+def _read_excel(source, engine):
+    return pd.read_excel(source, engine=engine, header=HEADER_ROW)
+
+def _read_text(source, delimiter):
+    # Only the needed columns are parsed, all as text like the Excel cells
+    offset = _text_header(_head_text(source), delimiter)[0]
+    return pd.read_csv(source, sep=delimiter, skiprows=offset, header=0, dtype=str, engine='c',
+                       encoding='utf-8-sig', encoding_errors='replace',
+                       usecols=lambda name: name.strip() in SOURCE_COLUMNS)
+
+READERS = {
+    'xlsx': lambda source: _read_excel(source, 'openpyxl'),
+    'xls': lambda source: _read_excel(source, 'xlrd'),  # Needs xlrd
+    'csv': lambda source: _read_text(source, ','),
+    'tsv': lambda source: _read_text(source, '\t'),
+}
+
+def read_table(source, kind=None):
+    """Read an export into a DataFrame with the cheapest reader for its format
+    
+    source is a path or binary file object; kind defaults to
+    sniff_format(source).
+    """
+    kind = kind or sniff_format(source)
+    logger.debug("Reading %s as %s", source, kind)
+    return normalize_columns(READERS[kind](source))
+
+def _records(header, rows):
+    """Yield {column: value} for the SOURCE_COLUMNS of each non-blank row"""
+    positions = {name.strip(): i for i, name in enumerate(header)
+                 if isinstance(name, str) and name.strip() in SOURCE_COLUMNS}
+    logger.info("Detected columns: %s", list(positions))
+    
+    for values in rows:
+        record = {name: values[i] if i < len(values) and values[i] != '' else None for name, i in positions.items()}
+        if any(value is not None for value in record.values()):
+            yield record
+
+def _iter_xlsx(source):
+    wb = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(min_row=HEADER_ROW + 1, values_only=True)
+        header = next(rows, None)
+        if header is not None:
+            yield from _records(header, rows)
+    finally:
+        wb.close()
+
+def _iter_xls(source):
+    import xlrd
+    
+    if isinstance(source, (str, os.PathLike)):
+        book = xlrd.open_workbook(source, on_demand=True)
+    else:
+        book = xlrd.open_workbook(file_contents=source.read(), on_demand=True)
+    try:
+        sheet = book.sheet_by_index(0)
+        if sheet.nrows > HEADER_ROW:
+            rows = (sheet.row_values(i) for i in range(HEADER_ROW + 1, sheet.nrows))
+            yield from _records(sheet.row_values(HEADER_ROW), rows)
+    finally:
+        book.release_resources()
+
+def _iter_text(source, delimiter):
+    offset = _text_header(_head_text(source), delimiter)[0]
+    path = isinstance(source, (str, os.PathLike))
+    f = (open if path else io.TextIOWrapper)(source, encoding='utf-8-sig', errors='replace', newline='')
+    try:
+        rows = csv.reader(f, delimiter=delimiter)
+        for _ in range(offset):
+            next(rows, None)
+        header = next(rows, None)
+        if header is not None:
+            yield from _records(header, rows)
+    finally:
+        # Leave a caller's file object open
+        f.close() if path else f.detach()
+
+ROW_READERS = {
+    'xlsx': _iter_xlsx,
+    'xls': _iter_xls,
+    'csv': lambda source: _iter_text(source, ','),
+    'tsv': lambda source: _iter_text(source, '\t'),
+}
+
+def iter_rows(source, kind=None):
+    """Stream the SOURCE_COLUMNS of an export as one dict per row, without pandas
+    
+    Memory stays constant whatever the file size; empty cells are None.
+    """
+    kind = kind or sniff_format(source)
+    return ROW_READERS[kind](source)
@@ -0,0 +1,78 @@
+import hashlib
+import json
+import os
+from bisect import bisect_right
+from collections import namedtuple
+from functools import lru_cache
+from time_parsing import parse_date
+
+DEFAULT_TERMS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'terms.json')
+
+Term = namedtuple('Term', ['id', 'name', 'start', 'end', 'aliases', 'exclusions'])
+Exclusion = namedtuple('Exclusion', ['name', 'start', 'end'])
+
+class TermRegistry:
+    """Academic terms sorted by start date, with O(log n) date lookup"""
+    
+    def __init__(self, terms):
+        self.terms = sorted(terms, key=lambda term: term.start)
+        self._starts = [term.start for term in self.terms]
+        self._by_name = {}
+        
+        for previous, term in zip(self.terms, self.terms[1:]):
+            if term.start <= previous.end:
+                raise ValueError(f"Terms {previous.id} and {term.id} overlap")
+        
+        for term in self.terms:
+            for name in (term.id, *term.aliases):
+                if name.lower() in self._by_name:
+                    raise ValueError(f"Duplicate term name '{name}'")
+                self._by_name[name.lower()] = term
+    
+    def digest(self):
+        """SHA-256 of every term's dates and exclusions, for keying cached output"""
+        fields = [(term.id, term.start, term.end, term.exclusions) for term in self.terms]
+        return hashlib.sha256(repr(fields).encode('utf-8')).hexdigest()
+    
+    def get(self, name):
+        """Look up a term by id or alias (case-insensitive)"""
+        try:
+            return self._by_name[name.lower()]
+        except KeyError:
+            raise ValueError(f"Invalid term specified: {name}") from None
+    
+    def find(self, day):
+        """Return the term containing a date, or None"""
+        i = bisect_right(self._starts, day) - 1
+        if i >= 0 and day <= self.terms[i].end:
+            return self.terms[i]
+        return None
+
+def _parse_term(entry):
+    """Build a Term from one entry of the terms file"""
+    exclusions = tuple(
+        Exclusion(item.get('name', ''), parse_date(item['start']), parse_date(item.get('end', item['start'])))
+        for item in entry.get('exclusions', [])
+    )
+    return Term(entry['id'], entry.get('name', entry['id']), parse_date(entry['start']),
+                parse_date(entry['end']), tuple(entry.get('aliases', [])), exclusions)
+
+def load_registry(path=None):
+    """Load terms from a JSON or TOML file
+    
+    Defaults to $XLSX_TO_CALENDAR_TERMS, then terms.json next to this module.
+    """
+    path = path or os.environ.get('XLSX_TO_CALENDAR_TERMS') or DEFAULT_TERMS_FILE
+    if path.endswith('.toml'):
+        import tomllib
+        with open(path, 'rb') as f:
+            data = tomllib.load(f)
+    else:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    return TermRegistry([_parse_term(entry) for entry in data['terms']])
+
+@lru_cache(maxsize=None)
+def default_registry():
+    """The registry used when none is passed explicitly, loaded once"""
+    return load_registry()
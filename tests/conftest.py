@@ -0,0 +1,45 @@
+import os
+import sys
+import pytest
+
+# The modules live at the repository root rather than in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Source columns of a small export; the second meeting's end date does not parse
+SCHEDULE = {
+    'Course Listing': ['CPSC 110', 'CPSC 121'],
+    'Section': ['CPSC 110 - 101', 'CPSC 121 - 101'],
+    'Meeting Patterns': ['2024-09-03 - 2024-12-05 | Mon Wed | 10:00 a.m. - 11:00 a.m. | Salle Émile-Borel',
+                         '2024-09-03 - 2024-13-45 | Tue | 14:00 - 16:00 | ICCS-Floor 0-Room 005'],
+    'Instructional Format': ['Lecture', 'Laboratory'],
+    'Instructor': ['Ada Lovelace', None],
+}
+
+SAMPLE_CSV = (
+    'Course Listing,Section,Meeting Patterns,Instructional Format,Instructor\n'
+    'CPSC 110,CPSC 110 - 101,2024-09-03 - 2024-12-05 | Mon Wed | 10:00 a.m. - 11:00 a.m. | DMP-Room 310,Lecture,Ada\n'
+)
+
+@pytest.fixture
+def schedule():
+    """SCHEDULE as the DataFrame process_excel_file would return"""
+    import pandas as pd
+    return pd.DataFrame(SCHEDULE)
+
+@pytest.fixture
+def meetings(schedule):
+    """The term1 meeting table of schedule"""
+    import xlsx_to_calendar
+    return xlsx_to_calendar.build_meeting_table(schedule, 'term1')
+
+@pytest.fixture
+def sample_csv():
+    """A one-section CSV export meeting on Mondays and Wednesdays"""
+    return SAMPLE_CSV
+
+@pytest.fixture
+def sample_csv_file(tmp_path, sample_csv):
+    """sample_csv written to tmp_path/sample.csv"""
+    path = tmp_path / 'sample.csv'
+    path.write_text(sample_csv, encoding='utf-8')
+    return str(path)
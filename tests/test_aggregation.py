@@ -0,0 +1,67 @@
+from aggregation import unique_stem
+
+def test_unique_stem_numbers_colliding_values():
+    stems = set()
+    assert [unique_stem(value, stems) for value in ['CPSC 110', 'CPSC/110', 'cpsc 110', '', '??']] == \
+        ['CPSC_110', 'CPSC_110-2', 'cpsc_110-3', 'unnamed', 'unnamed-2']
+    assert stems == {'cpsc_110', 'cpsc_110-2', 'cpsc_110-3', 'unnamed', 'unnamed-2'}
+
+def test_course_colors_depend_on_the_name_alone(tmp_path):
+    import re
+    import pandas as pd
+    import xlsx_to_calendar
+    from aggregation import build_indexes, write_views
+    
+    courses = [f'CPSC {n}' for n in range(100, 160)]
+    colors = xlsx_to_calendar.assign_course_colors(courses)
+    with_new = xlsx_to_calendar.assign_course_colors(courses + ['AAAA 100'])
+    assert {course: with_new[course] for course in courses} == colors
+    
+    # Each course shows one color on its course and room pages
+    df = pd.DataFrame({
+        'Course Listing': courses[:4],
+        'Section': [f'{course} - 101' for course in courses[:4]],
+        'Meeting Patterns': [f'2024-09-03 - 2024-12-05 | Mon | 10:00 - 11:00 | Room {i % 2}' for i in range(4)],
+    })
+    meetings = xlsx_to_calendar.build_meeting_table(df, 'term1')
+    manifest = write_views(meetings, build_indexes(meetings), str(tmp_path), 'term1')
+    for view in manifest.values():
+        for entry in view.values():
+            page = (tmp_path / (entry + '.html')).read_text(encoding='utf-8')
+            for safe_name, color in re.findall(r'\.course_(\S+) \{ background-color: (#\w+); \}', page):
+                assert color == xlsx_to_calendar.course_color(safe_name.replace('_', ' '))
+
+def test_aggregate_merges_exports_sharing_a_section(tmp_path, sample_csv):
+    import json
+    from aggregation import aggregate
+    from pipeline_metrics import PipelineMetrics
+    
+    exports = tmp_path / 'exports'
+    exports.mkdir()
+    (exports / 'a.csv').write_text(sample_csv, encoding='utf-8')
+    (exports / 'b.csv').write_text(
+        sample_csv + 'CPSC 210,CPSC 210 - 101,2024-09-03 - 2024-12-05 | Fri | 13:00 - 14:00 | DMP-Room 310,Lecture,Grace\n',
+        encoding='utf-8')
+    
+    metrics = PipelineMetrics()
+    out_dir = tmp_path / 'views'
+    manifest = aggregate([str(exports)], str(out_dir), 'term1', metrics=metrics)
+    
+    # CPSC 110's Monday and Wednesday meetings appear in both exports but count once
+    assert metrics.counters['files'] == 2
+    assert metrics.counters['duplicate_meetings'] == 2
+    assert metrics.counters['meetings'] == 3
+    assert manifest == {
+        'rooms': {'DMP-Room 310': 'rooms/DMP-Room_310'},
+        'instructors': {'Ada': 'instructors/Ada', 'Grace': 'instructors/Grace'},
+        'courses': {'CPSC 110': 'courses/CPSC_110', 'CPSC 210': 'courses/CPSC_210'},
+    }
+    assert json.loads((out_dir / 'index.json').read_text(encoding='utf-8')) == manifest
+    for view in manifest.values():
+        for entry in view.values():
+            assert (out_dir / (entry + '.html')).exists()
+    
+    # The shared room holds every merged meeting exactly once
+    assert (out_dir / 'rooms' / 'DMP-Room_310.ics').read_bytes().count(b'BEGIN:VEVENT') == 3
+    assert (out_dir / 'courses' / 'CPSC_110.ics').read_bytes().count(b'BEGIN:VEVENT') == 2
+    assert (out_dir / 'instructors' / 'Grace.ics').read_bytes().count(b'BEGIN:VEVENT') == 1
@@ -0,0 +1,29 @@
+import os
+import pytest
+from atomic_files import temp_path, write_atomic
+
+def test_write_atomic_replaces_file(tmp_path):
+    path = str(tmp_path / 'out.ics')
+    write_atomic(path, 'wb', lambda f: f.write(b'old'))
+    write_atomic(path, 'w', lambda f: f.write('new'))
+    assert open(path).read() == 'new'
+    assert os.listdir(tmp_path) == ['out.ics']
+
+def test_failed_write_keeps_previous_output(tmp_path):
+    path = str(tmp_path / 'out.html')
+    write_atomic(path, 'w', lambda f: f.write('complete'))
+    
+    def fail(f):
+        f.write('trunc')
+        raise RuntimeError('render failed')
+    
+    with pytest.raises(RuntimeError):
+        write_atomic(path, 'w', fail)
+    assert open(path).read() == 'complete'
+    assert os.listdir(tmp_path) == ['out.html']
+
+def test_temp_paths_are_unique():
+    assert temp_path('out.html') != temp_path('out.html')
+
+def test_write_atomic_returns_write_result(tmp_path):
+    assert write_atomic(str(tmp_path / 'out.ics'), 'wb', lambda f: f.write(b'feed')) == 4
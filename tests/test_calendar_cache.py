@@ -0,0 +1,58 @@
+import os
+import shutil
+import calendar_cache
+import xlsx_to_calendar
+
+def test_store_evicts_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(calendar_cache, '_estimates', {})
+    cache_dir = str(tmp_path)
+    for n, key in enumerate(['a', 'b', 'c']):
+        calendar_cache.store(key, {'out.ics': b'x' * 100}, cache_dir, max_bytes=250)
+        os.utime(os.path.join(cache_dir, key), (n, n))
+    assert sorted(os.listdir(cache_dir)) == ['b', 'c']
+    assert calendar_cache.lookup('a', cache_dir) is None
+
+def test_store_scans_only_when_estimate_exceeds_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(calendar_cache, '_estimates', {})
+    scans = []
+    evict = calendar_cache.evict
+    monkeypatch.setattr(calendar_cache, 'evict', lambda *args: scans.append(args) or evict(*args))
+    for key in range(10):
+        calendar_cache.store(str(key), {'out.ics': b'x' * 100}, str(tmp_path), max_bytes=10000)
+    assert len(scans) == 1
+
+def test_evicted_entry_is_a_miss(tmp_path):
+    entry = calendar_cache.store('key', {'out.html': b'page', 'out.ics': b'feed'}, str(tmp_path))
+    shutil.rmtree(entry)
+    assert xlsx_to_calendar._copy_cached(entry, str(tmp_path / 'sample')) is None
+
+def test_render_change_reuses_cached_meetings(tmp_path, monkeypatch, sample_csv_file):
+    monkeypatch.setenv('XLSX_TO_CALENDAR_CACHE', str(tmp_path / 'cache'))
+    monkeypatch.setattr(calendar_cache, '_estimates', {})
+    out_dir = str(tmp_path / 'out')
+    xlsx_to_calendar.convert_file(sample_csv_file, out_dir, 'term1')
+    
+    def fail(*args, **kwargs):
+        raise AssertionError('workbook read again')
+    
+    monkeypatch.setattr(xlsx_to_calendar, 'process_excel_file', fail)
+    metrics = xlsx_to_calendar.PipelineMetrics()
+    paths = xlsx_to_calendar.convert_file(sample_csv_file, out_dir, 'term1', metrics=metrics, ics_mode='expanded')
+    assert metrics.counters['meeting_cache_hits'] == 1
+    assert 'cache_hits' not in metrics.counters
+    assert open(paths[1], 'rb').read().count(b'BEGIN:VEVENT') > 2  # One per class
+
+def test_unreadable_cached_meetings_are_parsed_again(tmp_path, monkeypatch, sample_csv_file):
+    monkeypatch.setenv('XLSX_TO_CALENDAR_CACHE', str(tmp_path / 'cache'))
+    monkeypatch.setattr(calendar_cache, '_estimates', {})
+    out_dir = str(tmp_path / 'out')
+    xlsx_to_calendar.convert_file(sample_csv_file, out_dir, 'term1')
+    for entry in os.listdir(tmp_path / 'cache'):
+        jsonl = tmp_path / 'cache' / entry / 'meetings.jsonl'
+        if jsonl.exists():
+            jsonl.write_text('{"schema_version": "0"}\n')
+    
+    metrics = xlsx_to_calendar.PipelineMetrics()
+    paths = xlsx_to_calendar.convert_file(sample_csv_file, out_dir, 'term1', metrics=metrics, ics_mode='expanded')
+    assert 'meeting_cache_hits' not in metrics.counters
+    assert open(paths[1], 'rb').read().count(b'BEGIN:VEVENT') > 2
@@ -0,0 +1,29 @@
+from calendar_layout import Conflict, assign_lanes, find_conflicts
+
+def layout(intervals):
+    """{item: (lane, lanes)} of assign_lanes"""
+    return {p.item: (p.lane, p.lanes) for p in assign_lanes(intervals)}
+
+def test_touching_intervals_do_not_overlap():
+    intervals = [(60, 120, 'b'), (0, 60, 'a'), (120, 180, 'c')]
+    assert layout(intervals) == {'a': (0, 1), 'b': (0, 1), 'c': (0, 1)}
+    assert find_conflicts(intervals) == []
+
+def test_cluster_lane_count_is_peak_concurrency():
+    # a spans b and c, which do not overlap each other; d stands alone
+    intervals = [(0, 100, 'a'), (10, 50, 'b'), (60, 90, 'c'), (200, 300, 'd')]
+    assert layout(intervals) == {'a': (0, 2), 'b': (1, 2), 'c': (1, 2), 'd': (0, 1)}
+
+def test_lanes_are_reused_inside_a_cluster():
+    # c takes the lane a freed; d overlaps b and c, so the cluster peaks at three
+    intervals = [(0, 30, 'a'), (20, 50, 'b'), (40, 70, 'c'), (45, 60, 'd')]
+    assert layout(intervals) == {'a': (0, 3), 'b': (1, 3), 'c': (0, 3), 'd': (2, 3)}
+    assert [p.item for p in assign_lanes(intervals)] == ['a', 'b', 'c', 'd']
+
+def test_find_conflicts_reports_pairs_and_overlap_windows():
+    intervals = [(0, 100, 'a'), (10, 50, 'b'), (40, 60, 'c'), (100, 120, 'd')]
+    assert sorted(find_conflicts(intervals)) == [
+        Conflict('a', 'b', 10, 50),
+        Conflict('a', 'c', 40, 60),
+        Conflict('b', 'c', 40, 50),
+    ]
@@ -0,0 +1,53 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+import pytest
+from conversion_service import RETRY_AFTER_SECONDS, make_server
+
+@pytest.fixture
+def server(tmp_path):
+    server = make_server(port=0, jobs=1, queue_size=0, cache_dir=str(tmp_path))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    server.service.shutdown()
+
+def request(server, path, body=None, headers=None):
+    """(status, headers, body) of a request to the server"""
+    url = 'http://%s:%d%s' % (*server.server_address[:2], path)
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, body, headers or {})) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read()
+
+def test_convert_revalidate_reject_and_report(server, sample_csv):
+    status, headers, body = request(server, '/convert?format=ics', sample_csv.encode('utf-8'))
+    assert status == 200
+    assert body.startswith(b'BEGIN:VCALENDAR') and body.count(b'BEGIN:VEVENT') == 2
+    
+    # Every worker and queue slot taken: a revalidation is still answered
+    # without converting, while a new upload is shed, not queued
+    service = server.service
+    assert service.slots.acquire(blocking=False)
+    try:
+        status, _, body = request(server, '/convert?format=ics', sample_csv.encode('utf-8'),
+                                  {'If-None-Match': headers['ETag']})
+        assert (status, body) == (304, b'')
+        status, headers, body = request(server, '/convert', sample_csv.replace('Ada', 'Grace').encode('utf-8'))
+    finally:
+        service.slots.release()
+    assert status == 503
+    assert headers['Retry-After'] == str(RETRY_AFTER_SECONDS)
+    assert 'error' in json.loads(body)
+    
+    status, _, body = request(server, '/metrics')
+    metrics = json.loads(body)
+    assert status == 200
+    assert {name: metrics[name] for name in ['requests', 'conversions', 'cache_hits', 'not_modified', 'rejected']} == \
+        {'requests': 3, 'conversions': 1, 'cache_hits': 0, 'not_modified': 1, 'rejected': 1}
+    assert {'read', 'parse', 'html', 'ics'} <= set(metrics['pipeline']['stages'])
+    assert metrics['pipeline']['counters']['meetings'] == 2
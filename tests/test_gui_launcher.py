@@ -0,0 +1,31 @@
+import os
+import threading
+import pytest
+
+# Importing the launcher must not open a window
+gui_launcher = pytest.importorskip('gui_launcher')
+
+def test_output_names_match_batch_stems():
+    assert gui_launcher.output_names(['in/a.csv']) == ['course_calendar']
+    files = ['in/a.xlsx', 'in/a.csv', 'other/a.csv', 'other/B.csv', 'in/b.tsv']
+    assert gui_launcher.output_names(files) == ['a_xlsx', 'a_csv', 'a', 'B', 'b-2']
+
+def test_convert_with_progress_reports_each_phase(tmp_path, sample_csv_file):
+    reports = []
+    html_path, ics_path = gui_launcher.convert_with_progress(
+        sample_csv_file, str(tmp_path), 'term1', 'course_calendar',
+        lambda *report: reports.append(report), threading.Event())
+    assert (html_path, ics_path) == (str(tmp_path / 'course_calendar.html'), str(tmp_path / 'course_calendar.ics'))
+    assert open(ics_path, 'rb').read().count(b'BEGIN:VEVENT') == 2
+    assert [phase for phase, _, _ in reports] == ['读取', '解析', '生成网页', '写入事件']
+    assert reports[-1] == ('写入事件', 2, 2)
+
+def test_cancelled_conversion_writes_nothing(tmp_path, sample_csv_file):
+    cancel = threading.Event()
+    cancel.set()
+    out_dir = tmp_path / 'out'
+    out_dir.mkdir()
+    with pytest.raises(gui_launcher.ConversionCancelled):
+        gui_launcher.convert_with_progress(sample_csv_file, str(out_dir), 'term1', 'course_calendar',
+                                           lambda *report: None, cancel)
+    assert os.listdir(out_dir) == []
@@ -0,0 +1,62 @@
+import hashlib
+import json
+import os
+import re
+import pytest
+import html_compact
+import xlsx_to_calendar
+
+@pytest.fixture
+def overlapping():
+    """Two CPSC 110 sections overlapping on Monday and a lab whose name holds markup"""
+    import pandas as pd
+    return xlsx_to_calendar.build_meeting_table(pd.DataFrame({
+        'Course Listing': ['CPSC 110', 'CPSC 110', 'CPSC <121>'],
+        'Section': ['CPSC 110 - 101', 'CPSC 110 - 102', 'CPSC 121 - 101'],
+        'Meeting Patterns': ['2024-09-03 - 2024-12-05 | Mon | 10:00 - 11:00 | Room A',
+                             '2024-09-03 - 2024-12-05 | Mon | 10:30 - 11:30 | Room B',
+                             '2024-09-03 - 2024-12-05 | Tue | 14:00 - 16:00 | Room A'],
+        'Instructional Format': ['Lecture', 'Lecture', 'Laboratory'],
+    }), 'term1')
+
+def test_calendar_data_interns_values_and_adds_lanes(overlapping):
+    data = html_compact.calendar_data(overlapping)
+    assert data['c'] == [['CPSC 110', xlsx_to_calendar.course_color('CPSC 110')],
+                         ['CPSC <121>', xlsx_to_calendar.course_color('CPSC <121>')]]
+    assert data['l'] == ['Room A', 'Room B']
+    assert data['t'] == ['Lecture', 'Laboratory']
+    
+    # Only the overlapping Monday meetings carry [lane, lanes]
+    assert data['m'] == [[0, 0, 600, 660, 0, 0, 0, 2],
+                         [0, 0, 630, 690, 1, 0, 1, 2],
+                         [1, 1, 840, 960, 0, 1]]
+    assert data['h'] == [9, 17]
+
+def test_payload_cannot_close_its_script_element(overlapping):
+    page = html_compact.generate_compact_calendar(overlapping)
+    payload = re.search(r'<script type="application/json" id="meetings">(.*?)</script>', page).group(1)
+    assert '<' not in payload and '\\u003c121>' in payload
+    assert json.loads(payload)['c'][1][0] == 'CPSC <121>'
+
+def test_assets_are_content_addressed_and_written_once(tmp_path):
+    paths = html_compact.write_assets(str(tmp_path))
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            content = f.read()
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()[:10]
+        assert os.path.basename(path) == f"calendar.{digest}{os.path.splitext(path)[1]}"
+    
+    # An existing asset is already current
+    for path in paths:
+        os.utime(path, ns=(0, 0))
+    assert html_compact.write_assets(str(tmp_path)) == paths
+    assert all(os.stat(path).st_mtime_ns == 0 for path in paths)
+
+def test_pages_link_assets_relative_to_their_directory(tmp_path, overlapping):
+    assert html_compact.asset_prefix(str(tmp_path), str(tmp_path)) == ''
+    assert html_compact.asset_prefix(str(tmp_path / 'rooms'), str(tmp_path)) == '../'
+    assert html_compact.asset_prefix(str(tmp_path), str(tmp_path / 'static')) == 'static/'
+    
+    page = html_compact.generate_compact_calendar(overlapping, prefix='../')
+    assert f'href="../{html_compact.ASSETS["css"][0]}"' in page
+    assert f'src="../{html_compact.ASSETS["js"][0]}"' in page
@@ -0,0 +1,64 @@
+import json
+from datetime import datetime, timezone
+import pytest
+import ics_publish
+
+FIRST = datetime(2024, 9, 1, tzinfo=timezone.utc)
+LATER = datetime(2024, 9, 8, tzinfo=timezone.utc)
+
+def event(uid, location='Room 1'):
+    """(uid, property lines) as ics_writer.iter_events yields them"""
+    return uid, [f'SUMMARY:{uid}', f'UID:{uid}', 'DTSTAMP:20261016T000000Z', f'LOCATION:{location}']
+
+def lines_of(publication, uid):
+    return next(lines for lines in publication.delta + publication.events if f'UID:{uid}' in lines)
+
+def test_noop_republish_is_byte_identical(tmp_path):
+    out, delta, state = (str(tmp_path / name) for name in ['feed.ics', 'delta.ics', 'feed.state.json'])
+    events = [event('a'), event('b')]
+    assert ics_publish.publish(events, out, state, delta, FIRST)['added'] == 2
+    first = open(out, 'rb').read()
+    
+    counts = ics_publish.publish(events, out, state, delta, LATER)
+    assert counts == {'added': 0, 'changed': 0, 'unchanged': 2, 'cancelled': 0}
+    assert open(out, 'rb').read() == first
+    assert b'BEGIN:VEVENT' not in open(delta, 'rb').read()
+
+def test_changed_event_gets_next_sequence():
+    state = ics_publish.plan_publication([event('a'), event('b')], ics_publish.empty_state(), FIRST).state
+    publication = ics_publish.plan_publication([event('a', 'Room 2'), event('b')], state, LATER)
+    assert publication.counts['changed'] == 1
+    assert len(publication.delta) == 1 and 'UID:a' in publication.delta[0]
+    assert 'SEQUENCE:1' in lines_of(publication, 'a')
+    assert 'DTSTAMP:20240908T000000Z' in lines_of(publication, 'a')
+    assert 'SEQUENCE:0' in lines_of(publication, 'b')
+    assert 'DTSTAMP:20240901T000000Z' in lines_of(publication, 'b')
+
+def test_removed_event_is_cancelled_once():
+    state = ics_publish.plan_publication([event('a'), event('b')], ics_publish.empty_state(), FIRST).state
+    publication = ics_publish.plan_publication([event('a')], state, LATER)
+    assert publication.counts['cancelled'] == 1
+    assert len(publication.delta) == 1
+    cancelled = publication.delta[0]
+    assert 'UID:b' in cancelled and 'STATUS:CANCELLED' in cancelled and 'SEQUENCE:1' in cancelled
+    assert all('UID:b' not in lines for lines in publication.events)
+    
+    again = ics_publish.plan_publication([event('a')], publication.state, LATER)
+    assert again.counts['cancelled'] == 0
+    assert again.delta == []
+    assert again.state['events']['b']['cancelled']
+
+def test_returning_event_continues_from_tombstone():
+    state = ics_publish.plan_publication([event('a')], ics_publish.empty_state(), FIRST).state
+    state = ics_publish.plan_publication([], state, FIRST).state
+    publication = ics_publish.plan_publication([event('a')], state, LATER)
+    assert publication.counts['changed'] == 1
+    lines = lines_of(publication, 'a')
+    assert 'SEQUENCE:2' in lines and 'STATUS:CANCELLED' not in lines
+    assert 'cancelled' not in publication.state['events']['a']
+
+def test_state_of_another_version_is_rejected(tmp_path):
+    path = tmp_path / 'feed.state.json'
+    path.write_text(json.dumps({'version': ics_publish.STATE_VERSION + 1, 'events': {}}))
+    with pytest.raises(ValueError):
+        ics_publish.load_state(str(path))
@@ -0,0 +1,92 @@
+import io
+from datetime import datetime, timezone
+import pandas as pd
+import pytest
+import ics_publish
+import ics_writer
+import xlsx_to_calendar
+
+STAMP = 'DTSTAMP:' + ics_writer.DTSTAMP.strftime('%Y%m%dT%H%M%SZ')
+
+def dtstamps(calendar):
+    """The DTSTAMP lines of each VEVENT of an ICS calendar"""
+    blocks = calendar.decode('utf-8').replace('\r\n ', '').split('BEGIN:VEVENT\r\n')[1:]
+    assert blocks
+    return [[line for line in block.split('\r\n') if line.startswith('DTSTAMP')] for block in blocks]
+
+@pytest.mark.parametrize('mode', xlsx_to_calendar.ICS_MODES)
+def test_every_event_has_one_fixed_dtstamp(meetings, mode):
+    outputs = []
+    for _ in range(2):
+        f = io.BytesIO()
+        xlsx_to_calendar.write_ics_calendar(meetings, '2024/12/20', f, mode=mode)
+        outputs.append(f.getvalue())
+    assert outputs[0] == outputs[1]
+    assert all(lines == [STAMP] for lines in dtstamps(outputs[0]))
+
+def test_icalendar_path_uses_the_same_dtstamp(meetings):
+    calendar = xlsx_to_calendar.generate_ics_calendar(meetings, '2024/12/20').to_ical()
+    assert all(lines == [STAMP] for lines in dtstamps(calendar))
+
+def test_publish_replaces_dtstamp(meetings):
+    now = datetime(2024, 9, 1, 12, tzinfo=timezone.utc)
+    publication = ics_publish.plan_publication(xlsx_to_calendar.meeting_events(meetings, '2024/12/20'),
+                                               ics_publish.empty_state(), now)
+    for lines in publication.events:
+        assert [line for line in lines if line.startswith('DTSTAMP')] == ['DTSTAMP:20240901T120000Z']
+
+def events_by_uid(calendar):
+    """{uid: comparable fields} of each VEVENT, parsed back with icalendar"""
+    import icalendar
+    
+    def instant(value, tz):
+        if not isinstance(value, datetime):
+            return value
+        # A floating UNTIL is in the zone of DTSTART (RFC 5545 section 3.3.10)
+        return (value if value.tzinfo else value.replace(tzinfo=tz)).astimezone(timezone.utc)
+    
+    events = {}
+    for event in icalendar.Calendar.from_ical(calendar).walk('VEVENT'):
+        tz = event.decoded('dtstart').tzinfo
+        rrule = {name: [instant(value, tz) for value in values] for name, values in event['rrule'].items()}
+        events[str(event['uid'])] = (str(event['summary']), str(event['description']), str(event['location']),
+                                     instant(event.decoded('dtstart'), tz), instant(event.decoded('dtend'), tz), rrule)
+    return events
+
+def test_streaming_writer_matches_icalendar_path(schedule):
+    # Escaped characters and a non-ASCII location long enough to fold
+    extra = pd.DataFrame({
+        'Course Listing': ['MATH 100', 'CPSC 121'],
+        'Section': ['MATH 100 - 101', 'CPSC 121 - 101; L1A'],
+        'Meeting Patterns': ['2024-09-03 - 2024-12-05 | Fri | 8:00 a.m. - 9:00 a.m. | '
+                             'Mathématiques, Salle Émile-Borel, Étage 3, Aile Nord-Est, Pièce 300',
+                             '2024-09-03 - 2024-12-05 | Thu | 14:00 - 16:00 | ICCS-Floor 0-Room 005'],
+        'Instructional Format': ['Lecture', 'Laboratory'],
+        'Instructor': ['Émilie du Châtelet\\Voltaire', None],
+    })
+    df = pd.concat([schedule, extra], ignore_index=True)
+    meetings = xlsx_to_calendar.build_meeting_table(df, 'term1')
+    f = io.BytesIO()
+    xlsx_to_calendar.write_ics_calendar(meetings, '2024/12/20', f)
+    streamed = events_by_uid(f.getvalue())
+    assert len(streamed) == 5
+    assert streamed == events_by_uid(xlsx_to_calendar.generate_ics_calendar(meetings, '2024/12/20').to_ical())
+
+@pytest.mark.parametrize('prefix', ['', 'a', 'ab'])
+def test_fold_line_keeps_multibyte_characters_whole(prefix):
+    line = 'LOCATION:' + prefix + 'é' * 60 + '日本語' * 20
+    folded = ics_writer.fold_line(line)
+    assert folded.endswith(b'\r\n')
+    physical = folded[:-2].split(b'\r\n')
+    assert all(len(part) <= 75 for part in physical)
+    assert all(part.startswith(b' ') for part in physical[1:])
+    # Every physical line decodes on its own, so no character was split
+    assert ''.join(part.decode('utf-8')[1 if i else 0:] for i, part in enumerate(physical)) == line
+
+def test_fold_line_leaves_short_lines_alone():
+    assert ics_writer.fold_line('X' * 75) == b'X' * 75 + b'\r\n'
+    assert ics_writer.fold_line('X' * 76) == b'X' * 75 + b'\r\n X\r\n'
+
+def test_escape_text():
+    assert ics_writer.escape_text('a\\b;c,d\ne\r\nf') == r'a\\b\;c\,d\ne\nf'
+    assert ics_writer.escape_text(None) == 'None'
@@ -0,0 +1,38 @@
+import json
+import pandas as pd
+import pytest
+from meeting_export import read_meetings, write_meetings
+
+def test_jsonl_round_trip(meetings, tmp_path):
+    path = str(tmp_path / 'meetings.jsonl')
+    assert write_meetings(meetings, path) == path
+    assert pd.isna(meetings['end_date'].iloc[-1])  # Unparsable end dates survive too
+    pd.testing.assert_frame_equal(read_meetings(path), meetings)
+
+def test_jsonl_of_another_schema_is_rejected(meetings, tmp_path):
+    path = tmp_path / 'meetings.jsonl'
+    write_meetings(meetings, str(path))
+    header, *rows = path.read_text(encoding='utf-8').splitlines()
+    path.write_text('\n'.join([json.dumps({**json.loads(header), 'schema_version': '0'}), *rows]), encoding='utf-8')
+    with pytest.raises(ValueError):
+        read_meetings(str(path))
+    
+    # Files from before the header was written
+    path.write_text('\n'.join(rows), encoding='utf-8')
+    with pytest.raises(ValueError):
+        read_meetings(str(path))
+
+def test_render_keeps_only_the_requested_term(tmp_path, sample_csv):
+    from xlsx_to_calendar import run_cli
+    source = tmp_path / 'both.csv'
+    source.write_text(sample_csv + 'MATH 101,MATH 101 - 201,2025-01-06 - 2025-04-04 | Tue | 9:00 - 10:00 | '
+                      'MATH-Room 100,Lecture,Grace\n', encoding='utf-8')
+    export = str(tmp_path / 'both.jsonl')
+    assert run_cli(['export', str(source), export, '--term', 'all']) == 0
+    assert len(read_meetings(export)) == 3
+    
+    out_dir = tmp_path / 'out'
+    assert run_cli(['render', export, str(out_dir), '--term', 'term1']) == 0
+    ics = (out_dir / 'both.ics').read_text(encoding='utf-8')
+    assert ics.count('BEGIN:VEVENT') == 2 and 'MATH 101' not in ics
+    assert 'MATH 101' not in (out_dir / 'both.html').read_text(encoding='utf-8')
@@ -0,0 +1,84 @@
+import pandas as pd
+import pytest
+from pipeline_metrics import PipelineMetrics
+from schedule_core import parse_meeting_pattern
+from time_parsing import format_minutes
+import xlsx_to_calendar
+
+PATTERNS = [
+    '2024-09-03 - 2024-12-05 | Mon Wed Fri | 10:00 a.m. - 11:00 a.m. | DMP-Floor 3-Room 310',
+    '2024-09-03 - 2024-12-05 | Tue | 14:00 - 16:00 | ICCS-Floor 0-Room 005',
+    '2024-09-03 - 2024-12-05 | Tue Thu | 9:30 a.m. - 11:00 a.m. | MATH-Room 100\n\n'
+    '2025-01-06 - 2025-04-08 | Mon | 1:00 p.m. - 2:00 p.m. | LSK-Room 200',
+    '2025/01/06 - 2025/04/08 | Wed Fri | 12:00 p.m. - 1:30 p.m. | BUCH-Room A101',
+    '2024-09-03 - 2024-12-05 | Mon | 12:00 a.m. - 12:30 a.m.',
+    # Repeated cells are parsed once but still yield a row each
+    '2024-09-03 - 2024-12-05 | Tue | 14:00 - 16:00 | ICCS-Floor 0-Room 005',
+    # Malformed and blank cells
+    '2024-09-03 - 2024-12-05 | Mon',
+    '2024-09-03 - 2024-12-05 | Mon | 10:00',
+    '2024-09-03 - 2024-12-05 | Mon | noon - 1:00 p.m. | Room 1',
+    '',
+    None,
+    float('nan'),
+]
+
+def expected_rows(patterns):
+    """What parsing each cell on its own with parse_meeting_pattern gives"""
+    return [{'row': row, **meeting}
+            for row, pattern in enumerate(patterns)
+            for meeting in parse_meeting_pattern(pattern)]
+
+def test_parse_meeting_patterns_matches_per_cell_parse():
+    frame = xlsx_to_calendar.parse_meeting_patterns(pd.Series(PATTERNS, dtype=object))
+    columns = ['row', 'start_date', 'end_date', 'day', 'start_time', 'end_time', 'location']
+    assert frame[columns].to_dict('records') == expected_rows(PATTERNS)
+    assert frame['start_time'].tolist() == [format_minutes(m) for m in frame['start_mins']]
+    assert frame['end_time'].tolist() == [format_minutes(m) for m in frame['end_mins']]
+
+def test_parse_meeting_patterns_counts_per_row():
+    patterns = PATTERNS + ['2024-09-03 - 2024-12-05 | Mon']
+    vectorized, per_cell = PipelineMetrics(), PipelineMetrics()
+    xlsx_to_calendar.parse_meeting_patterns(pd.Series(patterns, dtype=object), vectorized)
+    for pattern in patterns:
+        parse_meeting_pattern(pattern, per_cell)
+    assert dict(vectorized.counters) == dict(per_cell.counters)
+
+@pytest.mark.parametrize('patterns', [[], [None, ''], ['2024-09-03 - 2024-12-05 | Mon']])
+def test_parse_meeting_patterns_without_meetings(patterns):
+    frame = xlsx_to_calendar.parse_meeting_patterns(pd.Series(patterns, dtype=object))
+    assert frame.empty
+    assert 'row' in frame and 'start_mins' in frame
+
+def test_build_meeting_table_matches_per_cell_parse():
+    df = pd.DataFrame({
+        'Course Listing': [f'CPSC {100 + i}' for i in range(len(PATTERNS))],
+        'Section': [f'CPSC {100 + i} - 001' for i in range(len(PATTERNS))],
+        'Meeting Patterns': PATTERNS,
+        'Instructional Format': ['Lecture'] * len(PATTERNS),
+        'Instructor': [None] + ['Ada Lovelace'] * (len(PATTERNS) - 1),
+    })
+    table = xlsx_to_calendar.build_meeting_table(df)
+    expected = [(df['Section'][row['row']], row['day'], row['start_time'], row['end_time'], row['location'])
+                for row in expected_rows(PATTERNS)]
+    actual = [(row.section, row.day, format_minutes(row.start_mins), format_minutes(row.end_mins), row.location)
+              for row in table.itertuples()]
+    assert actual == expected
+    assert '' in set(table['instructor'])
+    
+    # Streamed rows give the same table
+    streamed = xlsx_to_calendar.build_meeting_table(iter(df.to_dict('records')), chunk_size=4)
+    pd.testing.assert_frame_equal(streamed.astype(object), table.astype(object))
+
+def test_missing_end_date_runs_to_term_end():
+    df = pd.DataFrame({
+        'Course Listing': ['CPSC 110', 'CPSC 121'],
+        'Section': ['CPSC 110 - 101', 'CPSC 121 - 101'],
+        'Meeting Patterns': ['2024-09-03 - 2024-12-05 | Mon | 10:00 - 11:00 | Room 1',
+                             '2024-09-03 - 2024-13-45 | Mon | 10:00 - 11:00 | Room 1'],
+    })
+    table = xlsx_to_calendar.build_meeting_table(df, 'term1')
+    assert pd.isna(table['end_date'].iloc[1])
+    index, dates, _ = xlsx_to_calendar.expand_meeting_dates(table, '2024/12/06')
+    assert (dates[index == 1] == dates[index == 0]).all()
+    assert len(dates[index == 1]) == 13  # Mondays from Sep 9 to Dec 2
@@ -0,0 +1,73 @@
+import json
+import tracemalloc
+from pipeline_metrics import PipelineMetrics
+
+def test_hooks_see_every_stage_and_count():
+    events = []
+    metrics = PipelineMetrics(hooks=[lambda *event: events.append(event)])
+    late = []
+    metrics.add_hook(lambda kind, name, value: late.append(name))
+    with metrics.stage('parse'):
+        metrics.count('meetings', 3)
+    with metrics.stage('parse'):
+        pass
+    
+    assert [(kind, name) for kind, name, _ in events] == [('count', 'meetings'), ('stage', 'parse'), ('stage', 'parse')]
+    assert events[0][2] == 3
+    assert events[2][2] == {'seconds': metrics.stages['parse']['seconds'], 'calls': 2}
+    assert late == ['meetings', 'parse', 'parse']
+
+def test_merge_adds_stages_counters_and_allocations():
+    run = {'stages': {'parse': {'seconds': 1.5, 'calls': 2, 'retained_bytes': 100, 'peak_bytes': 700},
+                      'ics': {'seconds': 0.5, 'calls': 1}},
+           'counters': {'meetings': 4}}
+    totals = PipelineMetrics()
+    totals.merge(run)
+    other = PipelineMetrics()
+    other.merge({'stages': {'parse': {'seconds': 1.0, 'calls': 1, 'retained_bytes': 50, 'peak_bytes': 900}},
+                 'counters': {'meetings': 1, 'cache_hits': 1}})
+    totals.merge(other)
+    
+    assert totals.to_dict() == {
+        'stages': {'parse': {'seconds': 2.5, 'calls': 3, 'retained_bytes': 150, 'peak_bytes': 900},
+                   'ics': {'seconds': 0.5, 'calls': 1}},
+        'counters': {'meetings': 5, 'cache_hits': 1},
+    }
+
+def test_track_allocations_records_peak_and_retained_bytes():
+    kept = []
+    metrics = PipelineMetrics(track_allocations=True)
+    with metrics.stage('parse'):
+        kept.append(bytearray(1 << 20))
+        bytearray(4 << 20)
+    stats = metrics.stages['parse']
+    assert stats['retained_bytes'] >= 1 << 20
+    assert stats['peak_bytes'] >= 4 << 20
+    assert not tracemalloc.is_tracing()
+    
+    # Without tracking only time and calls are kept
+    metrics = PipelineMetrics()
+    with metrics.stage('parse'):
+        pass
+    assert set(metrics.stages['parse']) == {'seconds', 'calls'}
+
+def test_batch_writes_metrics_json(tmp_path, sample_csv):
+    from xlsx_to_calendar import run_cli
+    
+    in_dir = tmp_path / 'in'
+    in_dir.mkdir()
+    (in_dir / 'a.csv').write_text(sample_csv, encoding='utf-8')
+    (in_dir / 'b.csv').write_text(sample_csv, encoding='utf-8')
+    path = tmp_path / 'metrics.json'
+    assert run_cli(['batch', str(in_dir), str(tmp_path / 'out'), '--jobs', '1', '--no-cache',
+                    '--metrics', str(path)]) == 0
+    
+    report = json.loads(path.read_text(encoding='utf-8'))
+    assert report['wall_seconds'] > 0
+    assert sorted(report['files']) == [str(in_dir / 'a.csv'), str(in_dir / 'b.csv')]
+    for stats in report['files'].values():
+        assert stats['error'] is None and stats['seconds'] > 0
+        assert stats['counters']['meetings'] == 2
+    # Totals add up the per-file numbers
+    assert report['counters']['meetings'] == 4
+    assert report['stages']['ics']['calls'] == sum(stats['stages']['ics']['calls'] for stats in report['files'].values())
@@ -0,0 +1,40 @@
+import os
+from datetime import date, timedelta
+import pytest
+import xlsx_to_calendar
+from site_generator import generate_site, week_rows
+
+@pytest.fixture
+def site_meetings():
+    """CPSC 110 all term on Mondays and Wednesdays, CPSC 121 on Tuesdays until October 1"""
+    import pandas as pd
+    return xlsx_to_calendar.build_meeting_table(pd.DataFrame({
+        'Course Listing': ['CPSC 110', 'CPSC 121'],
+        'Section': ['CPSC 110 - 101', 'CPSC 121 - 101'],
+        'Meeting Patterns': ['2024-09-03 - 2024-12-05 | Mon Wed | 10:00 - 11:00 | Room A',
+                             '2024-09-03 - 2024-10-01 | Tue | 14:00 - 16:00 | Room B'],
+    }), 'term1')
+
+def test_weeks_follow_meeting_dates_and_breaks(site_meetings):
+    weeks = week_rows(site_meetings, xlsx_to_calendar.get_term_dates('term1')[1])
+    
+    # Both CPSC 110 days of the week of November 11 fall in the midterm break
+    mondays = [date(2024, 9, 2) + timedelta(weeks=n) for n in range(14)]
+    assert list(weeks) == [monday for monday in mondays if monday != date(2024, 11, 11)]
+    
+    courses = {monday: set(site_meetings['course'].iloc[rows]) for monday, rows in weeks.items()}
+    assert [monday for monday, names in courses.items() if 'CPSC 121' in names] == mondays[:5]
+    assert all(names == {'CPSC 110'} for monday, names in courses.items() if monday > date(2024, 9, 30))
+
+def test_rebuild_removes_stale_pages(tmp_path, site_meetings):
+    out_dir = tmp_path / 'site'
+    assert generate_site(site_meetings, str(out_dir), 'term1') == 13 + 2 + 2
+    assert sorted(os.listdir(out_dir / 'courses')) == ['CPSC_110.html', 'CPSC_121.html']
+    
+    # CPSC 121 is cancelled: its course and room pages go, the weeks stay
+    remaining = site_meetings[site_meetings['course'] == 'CPSC 110']
+    assert generate_site(remaining, str(out_dir), 'term1') == 13 + 1 + 1
+    assert os.listdir(out_dir / 'courses') == ['CPSC_110.html']
+    assert os.listdir(out_dir / 'rooms') == ['Room_A.html']
+    assert len(os.listdir(out_dir / 'weeks')) == 13
+    assert 'CPSC_121' not in (out_dir / 'index.html').read_text(encoding='utf-8')
@@ -0,0 +1,26 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Same budget and modules as benchmarks/run_benchmarks.py
+STARTUP_BUDGET = 0.25
+HEAVY_MODULES = ['pandas', 'numpy', 'pytz', 'icalendar', 'openpyxl']
+STARTUP_SCRIPT = (
+    "import sys, time; started = time.perf_counter(); import xlsx_to_calendar; "
+    "print(time.perf_counter() - started); print(*[m for m in %r if m in sys.modules])" % HEAVY_MODULES
+)
+
+def import_xlsx_to_calendar():
+    """(seconds, heavy modules loaded) for importing xlsx_to_calendar in a fresh interpreter"""
+    output = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout.splitlines()
+    return float(output[0]), output[1].split() if len(output) > 1 else []
+
+def test_import_defers_heavy_modules():
+    assert import_xlsx_to_calendar()[1] == []
+
+def test_import_within_budget():
+    # Best of a few runs, so a busy machine does not fail the test
+    assert min(import_xlsx_to_calendar()[0] for _ in range(3)) < STARTUP_BUDGET
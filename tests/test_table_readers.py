@@ -0,0 +1,50 @@
+import io
+import os
+import pytest
+import table_readers
+from table_readers import HEADER_ROW, XLS_MAGIC, XLSX_MAGIC, _text_header, sniff_format
+from xlsx_to_calendar import output_stems
+
+HEADER = ['Course Listing', 'Section', 'Meeting Patterns', 'Instructional Format', 'Instructor']
+ROW = ['CPSC 110', 'CPSC 110 - 101', '2024-09-03 - 2024-12-05 | Mon | 10:00 - 11:00 | Room 1', 'Lecture', 'Ada']
+
+def export(delimiter, title_rows=True):
+    lines = ['View My Courses', 'Filters'] if title_rows else []
+    lines += [delimiter.join(HEADER), delimiter.join(ROW)]
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+@pytest.mark.parametrize('title_rows', [True, False])
+@pytest.mark.parametrize('delimiter, kind', [(',', 'csv'), ('\t', 'tsv')])
+def test_sniff_format_tells_csv_from_tsv(delimiter, kind, title_rows):
+    assert sniff_format(io.BytesIO(export(delimiter, title_rows))) == kind
+
+def test_sniff_format_reads_magic_bytes_and_keeps_position():
+    assert sniff_format(io.BytesIO(XLSX_MAGIC + b'\0' * 16)) == 'xlsx'
+    assert sniff_format(io.BytesIO(XLS_MAGIC + b'\0' * 16)) == 'xls'
+    source = io.BytesIO(export(','))
+    sniff_format(source)
+    assert source.tell() == 0
+
+def test_sniff_format_ignores_commas_inside_tsv_cells():
+    # Meeting patterns and instructor lists contain commas
+    data = export('\t').replace(b'Ada', b'Lovelace, Ada, Babbage, Charles, Hopper, Grace')
+    assert sniff_format(io.BytesIO(data)) == 'tsv'
+
+@pytest.mark.parametrize('title_rows, offset', [(True, HEADER_ROW), (False, 0)])
+def test_text_header_finds_header_line(title_rows, offset):
+    text = export(',', title_rows).decode('utf-8')
+    assert _text_header(text, ',') == (offset, ','.join(HEADER))
+
+def test_text_header_accepts_quoted_names_and_falls_back():
+    assert _text_header('"Section","Instructor"\nA,B\n', ',')[0] == 0
+    assert _text_header('a\nb\nc\nd\n', ',') == (HEADER_ROW, 'c')
+
+def test_csv_and_tsv_read_alike():
+    tables = [table_readers.read_table(io.BytesIO(export(delimiter))) for delimiter in [',', '\t']]
+    assert tables[0].equals(tables[1])
+    assert tables[0]['Section'].tolist() == ['CPSC 110 - 101']
+
+def test_output_stems_keep_extension_only_on_collision():
+    files = [os.path.join('in', 'a.csv'), os.path.join('in', 'A.xlsx'), os.path.join('in', 'b.tsv'),
+             os.path.join('in', 'sub', 'a.xlsx')]
+    assert output_stems(files) == {files[0]: 'a_csv', files[1]: 'A_xlsx', files[2]: 'b', files[3]: 'a'}
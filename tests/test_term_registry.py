@@ -0,0 +1,27 @@
+from datetime import date, timedelta
+from term_registry import Exclusion, Term, TermRegistry, default_registry
+
+def make_registry(end=date(2024, 12, 20), exclusions=()):
+    return TermRegistry([
+        Term('term1', 'Winter Term 1', date(2024, 9, 3), end, ('fall',), exclusions),
+        Term('term2', 'Winter Term 2', date(2025, 1, 6), date(2025, 4, 30), (), ()),
+    ])
+
+def test_digest_is_stable():
+    assert make_registry().digest() == make_registry().digest()
+
+def test_digest_follows_dates_and_exclusions():
+    digests = {
+        make_registry().digest(),
+        make_registry(end=date(2024, 12, 19)).digest(),
+        make_registry(exclusions=(Exclusion('Midterm break', date(2024, 11, 11), date(2024, 11, 13)),)).digest(),
+    }
+    assert len(digests) == 3
+
+def test_is_in_term_uses_registry_bounds():
+    from xlsx_to_calendar import is_in_term
+    term = default_registry().get('term1')
+    assert is_in_term(term.start.isoformat(), 'term1')
+    assert is_in_term(term.end.strftime('%Y/%m/%d'), 'term1')
+    assert not is_in_term((term.end + timedelta(days=1)).isoformat(), 'term1')
+    assert not is_in_term('not a date', 'term1')
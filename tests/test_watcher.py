@@ -0,0 +1,89 @@
+import os
+from watcher import Watcher
+
+def test_exports_sharing_a_stem_keep_separate_outputs(tmp_path, sample_csv):
+    in_dir, out_dir = tmp_path / 'in', tmp_path / 'out'
+    in_dir.mkdir()
+    (in_dir / 'foo.csv').write_text(sample_csv)
+    (in_dir / 'foo.tsv').write_text(sample_csv.replace(',', '\t'))
+    watcher = Watcher(str(in_dir), str(out_dir), 'term1', debounce=0)
+    watcher.poll(now=0)
+    assert set(watcher.poll(now=1).values()) == {'updated'}
+    assert sorted(os.listdir(out_dir)) == ['foo_csv.html', 'foo_csv.ics', 'foo_tsv.html', 'foo_tsv.ics']
+    
+    os.remove(in_dir / 'foo.tsv')
+    assert watcher.poll(now=2) == {str(in_dir / 'foo.tsv'): 'removed'}
+    assert sorted(os.listdir(out_dir)) == ['foo_csv.html', 'foo_csv.ics']
+
+ROWS = {
+    'CPSC 110': 'CPSC 110,CPSC 110 - 101,2024-09-03 - 2024-12-05 | Mon | 10:00 - 11:00 | Room A,Lecture,Ada\n',
+    'CPSC 210': 'CPSC 210,CPSC 210 - 101,2024-09-03 - 2024-12-05 | Fri | 13:00 - 14:00 | Room B,Lecture,Grace\n',
+}
+
+def save(path, rows, version):
+    """Write an export with a distinct mtime for each version, as an editor would"""
+    path.write_text('Course Listing,Section,Meeting Patterns,Instructional Format,Instructor\n' + ''.join(rows))
+    os.utime(path, ns=(version * 10**9, version * 10**9))
+
+def mtimes(directory):
+    """{relative path: mtime_ns} of every file under directory"""
+    return {os.path.relpath(os.path.join(root, name), directory): os.stat(os.path.join(root, name)).st_mtime_ns
+            for root, _, names in os.walk(directory) for name in names}
+
+def settle(watcher, now):
+    """Poll twice past the debounce so a saved change is converted"""
+    watcher.poll(now=now)
+    return watcher.poll(now=now + 1)
+
+def age(directory):
+    """Set every file under directory to mtime 0, so rewrites stand out"""
+    for name in mtimes(directory):
+        os.utime(os.path.join(directory, name), ns=(0, 0))
+
+def test_resaved_file_with_the_same_meetings_is_not_rewritten(tmp_path):
+    in_dir, out_dir = tmp_path / 'in', tmp_path / 'out'
+    in_dir.mkdir()
+    path = in_dir / 'schedule.csv'
+    save(path, ROWS.values(), 1)
+    watcher = Watcher(str(in_dir), str(out_dir), 'term1', debounce=0)
+    assert settle(watcher, 0) == {str(path): 'updated'}
+    
+    age(out_dir)
+    save(path, ROWS.values(), 2)
+    assert settle(watcher, 2) == {str(path): 'unchanged'}
+    assert set(mtimes(out_dir).values()) == {0}
+
+def test_only_affected_view_entries_are_rewritten(tmp_path):
+    in_dir, out_dir, views = tmp_path / 'in', tmp_path / 'out', tmp_path / 'views'
+    in_dir.mkdir()
+    path = in_dir / 'schedule.csv'
+    save(path, ROWS.values(), 1)
+    watcher = Watcher(str(in_dir), str(out_dir), 'term1', aggregate_dir=str(views), debounce=0)
+    settle(watcher, 0)
+    
+    # CPSC 210 moves to a later slot: only its room, instructor and course change
+    age(views)
+    save(path, [ROWS['CPSC 110'], ROWS['CPSC 210'].replace('13:00 - 14:00', '15:00 - 16:00')], 2)
+    assert settle(watcher, 2) == {str(path): 'updated'}
+    rewritten = {name for name, mtime in mtimes(views).items() if mtime}
+    assert rewritten == {os.path.join(*entry.split('/')) + extension
+                         for entry in ['rooms/Room_B', 'instructors/Grace', 'courses/CPSC_210']
+                         for extension in ('.html', '.ics')} | {'index.json'}
+
+def test_view_entries_of_vanished_values_are_deleted(tmp_path):
+    in_dir, out_dir, views = tmp_path / 'in', tmp_path / 'out', tmp_path / 'views'
+    in_dir.mkdir()
+    path = in_dir / 'schedule.csv'
+    save(path, ROWS.values(), 1)
+    watcher = Watcher(str(in_dir), str(out_dir), 'term1', aggregate_dir=str(views), debounce=0)
+    settle(watcher, 0)
+    assert (views / 'rooms' / 'Room_B.ics').exists()
+    
+    save(path, [ROWS['CPSC 110'], ROWS['CPSC 210'].replace('Room B', 'Room C')], 2)
+    settle(watcher, 2)
+    assert sorted(os.listdir(views / 'rooms')) == ['Room_A.html', 'Room_A.ics', 'Room_C.html', 'Room_C.ics']
+    assert sorted(watcher.manifest['rooms']) == ['Room A', 'Room C']
+    
+    os.remove(path)
+    assert watcher.poll(now=4) == {str(path): 'removed'}
+    assert os.listdir(views / 'rooms') == os.listdir(views / 'courses') == []
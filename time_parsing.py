@@ -0,0 +1,32 @@
+from datetime import datetime
+from functools import lru_cache
+
+# Exports only contain a handful of distinct times and dates, so small
+# bounded caches absorb nearly every call
+CACHE_SIZE = 4096
+
+def format_minutes(minutes):
+    """Format minutes since midnight as HH:MM"""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+def is_twelve_hour(text):
+    """Whether a Workday time such as '10:00 a.m.' uses the 12-hour clock"""
+    return "a.m." in text or "p.m." in text
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_clock(text, twelve_hour=None):
+    """Parse '10:00 a.m.' or '14:00' into minutes since midnight
+    
+    twelve_hour forces the format; by default it is detected from text.
+    Raises ValueError for anything strptime would reject.
+    """
+    if twelve_hour is None:
+        twelve_hour = is_twelve_hour(text)
+    time_format = "%I:%M %p" if twelve_hour else "%H:%M"
+    parsed = datetime.strptime(text.replace('a.m.', 'AM').replace('p.m.', 'PM').strip(), time_format)
+    return parsed.hour * 60 + parsed.minute
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_date(text):
+    """Parse 'YYYY-MM-DD' or 'YYYY/MM/DD' into a date"""
+    return datetime.strptime(text.strip().replace('/', '-'), '%Y-%m-%d').date()
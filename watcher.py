@@ -0,0 +1,190 @@
+import json
+import logging
+import os
+import time
+from atomic_files import write_atomic
+from pipeline_metrics import NULL_METRICS
+import xlsx_to_calendar
+from xlsx_to_calendar import pd
+
+logger = logging.getLogger('xlsx_to_calendar')
+
+# Columns whose values name an aggregated view entry (see aggregation.VIEWS)
+VIEW_FIELDS = ['location', 'instructor', 'course']
+
+def row_hashes(meetings):
+    """{row hash: row position} identifying each meeting by its content"""
+    hashes = pd.util.hash_pandas_object(meetings[xlsx_to_calendar.MEETING_COLUMNS], index=False)
+    return {value: i for i, value in enumerate(hashes.to_numpy())}
+
+class Watcher:
+    """Polls a directory of workbooks and regenerates only what changed
+    
+    A file is converted once its size and mtime have stayed the same for
+    debounce seconds, so a burst of saves costs one conversion. Each
+    conversion is diffed against the file's previous meetings by row
+    hash: unchanged files are not re-rendered, and with aggregate_dir only
+    the rooms, instructors and courses touched by changed meetings are.
+    """
+    
+    def __init__(self, in_dir, out_dir, term, aggregate_dir=None, interval=1.0, debounce=2.0,
+                 ics_mode='weekly', metrics=NULL_METRICS):
+        xlsx_to_calendar.get_term_dates(term)  # Fail fast on an invalid term
+        self.in_dir = in_dir
+        self.out_dir = out_dir
+        self.term = term
+        self.aggregate_dir = aggregate_dir
+        self.interval = interval
+        self.debounce = debounce
+        self.ics_mode = ics_mode
+        self.metrics = metrics
+        self.signatures = {}  # path -> (mtime_ns, size) last converted
+        self.pending = {}  # path -> ((mtime_ns, size), first seen)
+        self.tables = {}  # path -> meeting table of the last conversion
+        self.hashes = {}  # path -> row_hashes of that table
+        self.outputs = {}  # path -> output_base it was written to
+        self.manifest = None
+    
+    def scan(self):
+        """Current (mtime_ns, size) of every workbook under in_dir"""
+        signatures = {}
+        for path in xlsx_to_calendar.find_excel_files(self.in_dir):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # Removed between listing and stat
+            signatures[path] = (stat.st_mtime_ns, stat.st_size)
+        return signatures
+    
+    def output_base(self, path, stem=None):
+        """Output path without extension, mirroring the input layout
+        
+        stem defaults to the file name without extension; see
+        xlsx_to_calendar.output_stems.
+        """
+        relative = os.path.relpath(os.path.dirname(path), self.in_dir)
+        stem = stem or os.path.splitext(os.path.basename(path))[0]
+        return os.path.normpath(os.path.join(self.out_dir, relative, stem))
+    
+    def poll(self, now=None):
+        """Run one scan; returns {path: 'updated' | 'unchanged' | 'removed' | 'failed'}"""
+        now = time.monotonic() if now is None else now
+        current = self.scan()
+        stems = xlsx_to_calendar.output_stems(current)
+        results = {}
+        affected = {field: set() for field in VIEW_FIELDS}
+        
+        for path in sorted(set(self.signatures) - set(current)):
+            self._remove(path, affected)
+            results[path] = 'removed'
+        
+        for path, signature in sorted(current.items()):
+            if self.signatures.get(path) == signature:
+                self.pending.pop(path, None)
+                continue
+            seen = self.pending.get(path)
+            if seen is None or seen[0] != signature:
+                self.pending[path] = (signature, now)
+                continue
+            if now - seen[1] < self.debounce:
+                continue
+            
+            del self.pending[path]
+            self.signatures[path] = signature
+            results[path] = self._convert(path, affected, stems[path])
+        
+        if self.aggregate_dir and any(affected.values()):
+            self._write_aggregate(affected)
+        return results
+    
+    def _convert(self, path, affected, stem=None):
+        """Parse one workbook and re-render its outputs if its meetings changed"""
+        try:
+            meetings = xlsx_to_calendar.build_meeting_table(xlsx_to_calendar.process_excel_file(path), self.term)
+        except Exception as e:
+            # Often a file still being written; it is retried on its next change
+            logger.warning("Could not convert %s: %s", path, e)
+            self.metrics.count('watch_failures')
+            return 'failed'
+        
+        hashes = row_hashes(meetings)
+        previous = self.hashes.get(path, {})
+        base_path = self.output_base(path, stem)
+        if path in self.tables and hashes.keys() == previous.keys() and self.outputs.get(path) == base_path:
+            self.metrics.count('watch_unchanged')
+            return 'unchanged'
+        
+        # Meetings that appeared or disappeared decide which views are stale
+        old = self.tables.get(path)
+        for key in hashes.keys() - previous.keys():
+            self._collect(meetings, hashes[key], affected)
+        for key in previous.keys() - hashes.keys():
+            self._collect(old, previous[key], affected)
+        self.tables[path] = meetings
+        self.hashes[path] = hashes
+        
+        # The name changes when another export with the same stem comes or goes
+        moved = self.outputs.get(path)
+        if moved and moved != base_path:
+            self._remove_outputs(moved)
+        self.outputs[path] = base_path
+        os.makedirs(os.path.dirname(base_path), exist_ok=True)
+        term_end = xlsx_to_calendar.get_term_dates(self.term)[1]
+        write_atomic(base_path + '.html', 'w',
+                     lambda f: xlsx_to_calendar.write_course_calendar(meetings, f, self.metrics))
+        write_atomic(base_path + '.ics', 'wb',
+                     lambda f: xlsx_to_calendar.write_ics_calendar(meetings, term_end, f, self.metrics, self.ics_mode))
+        self.metrics.count('watch_updates')
+        return 'updated'
+    
+    def _remove(self, path, affected):
+        """Forget a deleted workbook and remove its outputs"""
+        self.signatures.pop(path, None)
+        self.pending.pop(path, None)
+        self.hashes.pop(path, None)
+        old = self.tables.pop(path, None)
+        if old is not None:
+            for position in range(len(old)):
+                self._collect(old, position, affected)
+        # Only what this file wrote; another export may own its default name
+        if path in self.outputs:
+            self._remove_outputs(self.outputs.pop(path))
+    
+    def _remove_outputs(self, base_path):
+        """Delete the .html and .ics written to base_path"""
+        for extension in ('.html', '.ics'):
+            output = base_path + extension
+            if os.path.exists(output):
+                os.remove(output)
+    
+    def _collect(self, meetings, position, affected):
+        """Record the view entries a meeting belongs to"""
+        for field in VIEW_FIELDS:
+            affected[field].add(meetings[field].iloc[position])
+    
+    def _write_aggregate(self, affected):
+        """Re-render the aggregated view entries touched by this poll"""
+        import aggregation
+        
+        meetings = aggregation.merge_meeting_tables(self.tables.values())
+        indexes = aggregation.build_indexes(meetings)
+        if self.manifest is None:
+            manifest_path = os.path.join(self.aggregate_dir, 'index.json')
+            if os.path.exists(manifest_path):
+                with open(manifest_path, encoding='utf-8') as f:
+                    self.manifest = json.load(f)
+        os.makedirs(self.aggregate_dir, exist_ok=True)
+        self.manifest = aggregation.write_views(meetings, indexes, self.aggregate_dir, self.term, self.metrics,
+                                                only=affected, manifest=self.manifest, ics_mode=self.ics_mode)
+    
+    def run(self):
+        """Poll until interrupted, printing what happened to each file"""
+        print(f"Watching {self.in_dir} every {self.interval:g}s (Ctrl+C to stop)")
+        try:
+            while True:
+                for path, result in self.poll().items():
+                    print(f"{time.strftime('%H:%M:%S')} {result:<9} {os.path.relpath(path, self.in_dir)}")
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            pass
+        return 0
@@ -1,19 +1,46 @@
-import pandas as pd
 from datetime import datetime, timedelta
-import random
+import hashlib
+import html
+import json
 import os
-import re
-import pytz
-from icalendar import Calendar, Event
+import sys
+import time
+import argparse
+import csv
+import shutil
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import islice
+import calendar_cache
+from atomic_files import write_atomic
+import ics_writer
+import table_readers
+from time_parsing import format_minutes, parse_date
+from term_registry import default_registry
+from pipeline_metrics import PipelineMetrics, NULL_METRICS, profile
+from calendar_layout import assign_lanes, find_conflicts
+from schedule_core import MEETING_COLUMNS, MeetingSlot, iter_meetings, parse_meeting_pattern, parse_meeting_slots
+from lazy_modules import lazy_import
+
+# Heavy dependencies load on first use so short-lived runs start quickly
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
+pytz = lazy_import('pytz')
+icalendar = lazy_import('icalendar')
+occurrences = lazy_import('occurrences')  # Pulls in numpy
 import warnings
 warnings.filterwarnings('ignore', category=UserWarning)
 
-def generate_random_color():
-    """Generate a light pastel color"""
-    hue = random.random()
-    saturation = 0.3 + random.random() * 0.2
-    value = 0.9 + random.random() * 0.1
-    
+logger = logging.getLogger('xlsx_to_calendar')
+
+# Bump whenever rendering changes so cached outputs are not reused
+GENERATOR_VERSION = '8'
+
+# Bump whenever parsing changes so cached meeting tables are not reused
+PARSER_VERSION = '1'
+
+def pastel_color(hue, saturation, value):
+    """Convert an HSV color to a #rrggbb string"""
     h = hue * 6
     c = value * saturation
     x = c * (1 - abs(h % 2 - 1))
@@ -38,181 +65,177 @@ def generate_random_color():
     
     return f"#{r:02x}{g:02x}{b:02x}"
 
-def parse_meeting_pattern(pattern):
-    """Parse the complete meeting pattern including dates, times, and location"""
-    if not isinstance(pattern, str) or pd.isna(pattern):
-        return []
+# Stepping the hue by the golden ratio keeps neighbouring entries far apart
+# on the color wheel; saturation and value alternate for extra contrast.
+# Large enough that two courses on one page rarely share a color
+COURSE_PALETTE = tuple(
+    pastel_color((i * 0.618033988749895) % 1, 0.3 + (i % 3) * 0.08, 0.96 - (i % 2) * 0.04)
+    for i in range(48)
+)
 
-    try:
-        # Split into blocks and clean them
-        blocks = [block.strip() for block in pattern.split('\n\n') if block.strip()]
-        results = []
-        
-        for block in blocks:
-            try:
-                # Split the single line into parts using |
-                parts = [p.strip() for p in block.split('|') if p.strip()]
-                if len(parts) < 3:
-                    continue
-
-                # Parse date range
-                date_range = parts[0]
-                date_parts = re.split(r'[/-]', date_range)  # Support '/' or '-' as separators
-                start_date = '-'.join(date_parts[:3]).strip()
-                end_date = '-'.join(date_parts[3:]).strip()
-
-                # Parse days and times
-                day_time = parts[1]
-                days = day_time.split()  # Split into individual days
-                
-                time_parts = parts[2].strip().split('-')
-                if len(time_parts) != 2:
-                    continue
-
-                # Detect and parse time format
-                time_format = "%I:%M %p" if "a.m." in time_parts[0] or "p.m." in time_parts[0] else "%H:%M"
-                start_time = datetime.strptime(time_parts[0].replace('a.m.', 'AM').replace('p.m.', 'PM').strip(), time_format).strftime("%H:%M")
-                end_time = datetime.strptime(time_parts[1].replace('a.m.', 'AM').replace('p.m.', 'PM').strip(), time_format).strftime("%H:%M")
-
-                # Get location
-                location = parts[3].strip() if len(parts) > 3 else ""
-
-                # Add each day to results
-                for day in days:
-                    results.append({
-                        'start_date': start_date,
-                        'end_date': end_date,
-                        'day': day,
-                        'start_time': start_time,
-                        'end_time': end_time,
-                        'location': location
-                    })
-
-            except Exception as block_error:
-                print(f"Error processing block: {block_error}")
-                continue
+def course_color_index(course_name):
+    """Stable palette slot of a course, independent of run and hash seed"""
+    digest = hashlib.sha1(str(course_name).encode('utf-8')).digest()
+    return int.from_bytes(digest[:4], 'big') % len(COURSE_PALETTE)
 
-        return results
+def course_color(course_name):
+    """Palette color of a course, a function of its name alone"""
+    return COURSE_PALETTE[course_color_index(course_name)]
 
-    except Exception as e:
-        print(f"Error in parse_meeting_pattern: {e}")
-        return []
+def assign_course_colors(course_names):
+    """Map each course to its course_color
+    
+    Colors do not depend on the other courses, so a course looks the same
+    on every page and adding a course never recolors another. The price is
+    that two courses on one page occasionally share a color.
+    """
+    return {name: course_color(name) for name in set(course_names)}
+
+def parse_meeting_patterns(patterns, metrics=NULL_METRICS):
+    """Parse a whole Meeting Patterns column into a long-form meeting frame
+    
+    Returns one row per meeting day with the same fields as
+    parse_meeting_pattern, plus start_mins/end_mins and a 'row' column
+    holding the index label of the source cell.
+    """
+    columns = ['row', 'start_date', 'end_date', 'day', 'start_time', 'end_time',
+               'start_mins', 'end_mins', 'location']
+    patterns = patterns[patterns.map(lambda value: isinstance(value, str))]
+    if patterns.empty:
+        return pd.DataFrame(columns=columns)
+    
+    # Registrar exports repeat the same pattern across many sections, so
+    # each distinct cell is parsed once (clock and date parsing are
+    # memoized too) and the result is joined back to every row using it
+    codes, distinct = pd.factorize(patterns)
+    row_counts = np.bincount(codes, minlength=len(distinct))
+    
+    slot_codes = []
+    slots = []
+    cell_metrics = PipelineMetrics()
+    for code, pattern in enumerate(distinct.tolist()):
+        cell_slots = parse_meeting_slots(pattern, cell_metrics)
+        slot_codes.extend([code] * len(cell_slots))
+        slots.extend(cell_slots)
+        if cell_metrics.counters:
+            # Skips and failures count once per source row, as if parsed per row
+            for name, n in cell_metrics.counters.items():
+                metrics.count(name, n * int(row_counts[code]))
+            cell_metrics.counters.clear()
+    if not slots:
+        return pd.DataFrame(columns=columns)
+    
+    frame = pd.DataFrame.from_records(slots, columns=MeetingSlot._fields)
+    frame['code'] = slot_codes
+    frame = frame.astype({'start_mins': 'int64', 'end_mins': 'int64'})
+    # Few distinct times, so format each once
+    for minutes, text in [('start_mins', 'start_time'), ('end_mins', 'end_time')]:
+        labels = {value: format_minutes(value) for value in frame[minutes].unique().tolist()}
+        frame[text] = frame[minutes].map(labels)
     
+    sources = pd.DataFrame({'row': patterns.index, 'code': codes})
+    return sources.merge(frame, on='code')[columns]
+
 def get_term_dates(term):
     """Get start and end dates for the specified term"""
-    if term.lower() == 'term1':
-        return '2024/09/03', '2024/12/06'
-    elif term.lower() == 'term2':
-        return '2025/01/06', '2025/04/06'
-    else:
-        raise ValueError("Invalid term specified")
+    term = default_registry().get(term)
+    return term.start.strftime('%Y/%m/%d'), term.end.strftime('%Y/%m/%d')
 
 def is_in_term(start_date, term):
     """Check if a course is in the selected term"""
     try:
-        # Normalize date format to handle both '-' and '/'
-        normalized_date = start_date.replace('/', '-')
-        course_date = datetime.strptime(normalized_date, '%Y-%m-%d')
-        
-        if term == 'term1':
-            term_start = datetime(2024, 9, 3)
-            term_end = datetime(2024, 12, 6)
-        else:  # term2
-            term_start = datetime(2025, 1, 6)
-            term_end = datetime(2025, 4, 6)
-            
-        return term_start <= course_date <= term_end
+        # parse_date accepts both '-' and '/' separators
+        course_date = parse_date(start_date)
+        term = default_registry().get(term)
+        return term.start <= course_date <= term.end
     except Exception as e:
-        print(f"Error checking term for date '{start_date}': {e}")
+        logger.warning("Error checking term for date '%s': %s", start_date, e)
         return False
         
-def generate_course_calendar(df, selected_term):
-    """Generate HTML calendar from course data"""
-    schedule = {
-        'Monday': [],
-        'Tuesday': [],
-        'Wednesday': [],
-        'Thursday': [],
-        'Friday': []
-    }
+def build_meeting_table(df, selected_term=None, chunk_size=10000, metrics=NULL_METRICS):
+    """Parse every row once into a normalized table with one row per meeting
     
-    course_styles = []
-    course_colors = {}
-    time_slots = {day: {} for day in schedule.keys()}
+    df may also be an iterator of row dicts (see iter_excel_rows), which is
+    consumed chunk_size rows at a time.
+    """
+    if not isinstance(df, pd.DataFrame):
+        rows = iter(df)
+        tables = []
+        while True:
+            with metrics.stage('read'):
+                chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            table = build_meeting_table(pd.DataFrame.from_records(chunk), selected_term, metrics=metrics)
+            if not table.empty:
+                tables.append(table)
+        if not tables:
+            return build_meeting_table(pd.DataFrame(columns=table_readers.SOURCE_COLUMNS), selected_term)
+        return compact_meeting_table(pd.concat(tables, ignore_index=True))
     
-    # Track earliest and latest times
-    earliest_time = 24 * 60  # Initialize to end of day
-    latest_time = 0  # Initialize to start of day
+    metrics.count('rows', len(df))
+    with metrics.stage('parse'):
+        meetings = parse_meeting_patterns(df['Meeting Patterns'].reset_index(drop=True), metrics)
     
-    # Process courses and find time range
-    for _, row in df.iterrows():
-        try:
-            course_name = str(row['Course Listing'])
-            meeting_pattern = str(row['Meeting Patterns'])
-            course_type = str(row.get('Instructional Format', 'Lecture'))
-            
-            if pd.isna(meeting_pattern):
-                continue
-            
-            if course_name not in course_colors:
-                course_colors[course_name] = generate_random_color()
-                safe_name = course_name.replace(' ', '_').replace('.', '_')
-                course_styles.append(f".course_{safe_name} {{ background-color: {course_colors[course_name]}; }}")
-            
-            meetings = parse_meeting_pattern(meeting_pattern)
-            
-            for meeting in meetings:
-                if not is_in_term(meeting['start_date'], selected_term):
-                    continue
-                    
-                start_parts = meeting['start_time'].split(':')
-                end_parts = meeting['end_time'].split(':')
-                start_mins = int(start_parts[0]) * 60 + int(start_parts[1])
-                end_mins = int(end_parts[0]) * 60 + int(end_parts[1])
-                
-                # Update time range
-                earliest_time = min(earliest_time, start_mins)
-                latest_time = max(latest_time, end_mins)
-                
-                day_map = {
-                    'Mon': 'Monday',
-                    'Tue': 'Tuesday',
-                    'Wed': 'Wednesday',
-                    'Thu': 'Thursday',
-                    'Fri': 'Friday'
-                }
-                day = day_map.get(meeting['day'])
-                
-                if day and day in schedule:
-                    time_key = f"{meeting['start_time']}-{meeting['end_time']}"
-                    
-                    if time_key in time_slots[day] and time_slots[day][time_key] == course_name:
-                        continue
-                    
-                    course_info = {
-                        'name': course_name,
-                        'start': meeting['start_time'],
-                        'end': meeting['end_time'],
-                        'location': meeting['location'],
-                        'safe_name': course_name.replace(' ', '_').replace('.', '_'),
-                        'type': course_type,
-                        'start_mins': start_mins,
-                        'end_mins': end_mins
-                    }
-                    schedule[day].append(course_info)
-                    time_slots[day][time_key] = course_name
-            
-        except Exception as e:
-            print(f"Error processing course {course_name}: {e}")
-            continue
+    with metrics.stage('filter'):
+        return _filter_meetings(df, meetings, selected_term, metrics)
 
-    # Round time range to nearest hour
-    start_hour = (earliest_time // 60) - 1  # One hour before earliest class
-    end_hour = (latest_time // 60) + 1  # One hour after latest class
-    hour_height = 100  # 100px per hour
+def _filter_meetings(df, meetings, selected_term, metrics):
+    """Apply the term filter and attach the section columns of each meeting"""
+    start_dates = pd.to_datetime(meetings['start_date'], format='%Y-%m-%d', errors='coerce')
+    end_dates = pd.to_datetime(meetings['end_date'], format='%Y-%m-%d', errors='coerce')
+    keep = start_dates.notna()
+    if selected_term:
+        term = default_registry().get(selected_term)
+        keep &= (start_dates >= pd.Timestamp(term.start)) & (start_dates <= pd.Timestamp(term.end))
+    
+    meetings = meetings[keep]
+    rows = df.iloc[meetings['row']]
+    
+    def column(name, default=''):
+        # Blank cells become '' whatever the reader, like iter_meetings
+        if name not in df:
+            return default
+        return rows[name].fillna('').astype(str).to_numpy()
+    
+    table = pd.DataFrame({
+        'section': column('Section'),
+        'course': column('Course Listing'),
+        'format': column('Instructional Format'),
+        'instructor': column('Instructor'),
+        'day': meetings['day'].to_numpy(),
+        'start_mins': meetings['start_mins'].to_numpy(dtype='int64'),
+        'end_mins': meetings['end_mins'].to_numpy(dtype='int64'),
+        'start_date': start_dates[keep].dt.date.to_numpy(),
+        'end_date': end_dates[keep].dt.date.to_numpy(),
+        'location': meetings['location'].to_numpy(),
+    }, columns=MEETING_COLUMNS)
+    metrics.count('meetings', len(table))
+    return compact_meeting_table(table)
+
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+CATEGORY_COLUMNS = ['section', 'course', 'format', 'instructor', 'location', 'start_date', 'end_date']
+
+def compact_meeting_table(table):
+    """Convert a meeting table to its compact column types
+    
+    Text and date columns become categoricals, so each distinct value is
+    stored once and rows hold small integer codes (date categories are
+    sorted, so codes follow the calendar). Days are coded in week order
+    and minute offsets are int16. Values read back unchanged, so consumers
+    need not care; concatenating tables with different categories falls
+    back to object columns, so re-apply this after pd.concat.
+    """
+    unknown_days = sorted(set(table['day'].dropna()) - set(WEEKDAYS))
+    return table.astype({
+        **{column: 'category' for column in CATEGORY_COLUMNS},
+        'day': pd.CategoricalDtype(WEEKDAYS + unknown_days),
+        'start_mins': 'int16',
+        'end_mins': 'int16',
+    })
 
-    # Generate HTML
-    html = """
+# Static page fragments, built once at import time
+HTML_HEAD = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -318,12 +341,8 @@ def generate_course_calendar(df, selected_term):
                 margin-top: 3px;
             }
     """
-    
-    # Add course styles
-    for style in course_styles:
-        html += style + "\n"
-    
-    html += """
+
+HTML_BODY_START = """
         </style>
     </head>
     <body>
@@ -341,158 +360,763 @@ def generate_course_calendar(df, selected_term):
             <!-- Time column -->
             <div class="time-column">
     """
+
+HTML_COURSE_BLOCK = """
+                <div class="course course_{safe_name}{lab_class}"
+                     style="top: {top}px; height: {height}px;{lane_style}">
+                    <div class="course-type">{type}</div>
+                    <div class="time">{start} - {end}</div>
+                    <strong>{name}</strong>
+                    <div class="location">{location}</div>
+                </div>
+            """
+
+HTML_TAIL = """
+        </div>
+    </body>
+    </html>
+    """
+
+DEFAULT_TITLE = 'Course Schedule'
+
+# full: self-contained page; compact: JSON meetings plus shared assets (html_compact)
+HTML_MODES = ['full', 'compact']
+
+def _schedule_blocks(meetings):
+    """Group a meeting table into the blocks shown on the weekly grid
+    
+    Returns (schedule, start_hour, end_hour): schedule maps 'Monday' to
+    'Friday' to (start_mins, end_mins, course, location, type) tuples, and
+    the hours bound the grid with an hour of margin on each side.
+    """
+    schedule = {
+        'Monday': [],
+        'Tuesday': [],
+        'Wednesday': [],
+        'Thursday': [],
+        'Friday': []
+    }
+    day_map = {
+        'Mon': 'Monday',
+        'Tue': 'Tuesday',
+        'Wed': 'Wednesday',
+        'Thu': 'Thursday',
+        'Fri': 'Friday'
+    }
+    
+    time_slots = {day: {} for day in schedule.keys()}
+    
+    # Track earliest and latest times
+    earliest_time = int(meetings['start_mins'].min()) if len(meetings) else 24 * 60
+    latest_time = int(meetings['end_mins'].max()) if len(meetings) else 0
+    
+    # Meetings stay plain tuples; HH:MM strings are only built for output
+    columns = zip(meetings['course'], meetings['day'], meetings['start_mins'],
+                  meetings['end_mins'], meetings['location'], meetings['format'])
+    for course_name, day, start_mins, end_mins, location, course_type in columns:
+        day = day_map.get(day)
+        if day and day in schedule:
+            time_key = (start_mins, end_mins)
+            if time_slots[day].get(time_key) == course_name:
+                continue
+            schedule[day].append((start_mins, end_mins, course_name, location, course_type or 'Lecture'))
+            time_slots[day][time_key] = course_name
+
+    # Round time range to nearest hour
+    start_hour = (earliest_time // 60) - 1  # One hour before earliest class
+    end_hour = (latest_time // 60) + 1  # One hour after latest class
+    return schedule, start_hour, end_hour
+
+def _render_course_calendar(meetings, title=DEFAULT_TITLE):
+    """Yield the HTML calendar page as a sequence of fragments"""
+    head, body_start = HTML_HEAD, HTML_BODY_START
+    if title != DEFAULT_TITLE:
+        title = html.escape(title)
+        head = head.replace(f'<title>{DEFAULT_TITLE}</title>', f'<title>{title}</title>')
+        body_start = body_start.replace(f'<h2>{DEFAULT_TITLE}</h2>', f'<h2>{title}</h2>')
+    schedule, start_hour, end_hour = _schedule_blocks(meetings)
+    hour_height = 100  # 100px per hour
+    
+    # Work per distinct course rather than per meeting
+    course_colors = assign_course_colors(meetings['course'])
+    safe_names = {course: course.replace(' ', '_').replace('.', '_') for course in course_colors}
+    course_styles = [
+        f".course_{safe_names[course]} {{ background-color: {course_colors[course]}; }}"
+        for course in pd.unique(meetings['course'])
+    ]
+
+    # Generate HTML from fragments in one pass
+    yield head
+    
+    # Add course styles
+    for style in course_styles:
+        yield style + "\n"
+    
+    yield body_start
     
     # Add time slots
     for hour in range(start_hour, end_hour + 1):
-        html += f'<div class="time-slot">{hour:02d}:00</div>'
+        yield f'<div class="time-slot">{hour:02d}:00</div>'
     
-    html += "</div>"
+    yield "</div>"
     
     # Add day columns
     for day in ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']:
-        html += f'<div class="day-column">'
+        yield '<div class="day-column">'
         
-        # Add courses for this day
-        for course in sorted(schedule[day], key=lambda x: x['start_mins']):
+        # Overlapping courses share the column side by side
+        intervals = [(block[0], block[1], block) for block in schedule[day]]
+        for placement in assign_lanes(intervals):
+            start_mins, end_mins, course_name, location, course_type = placement.item
+            lane_style = ''
+            if placement.lanes > 1:
+                width = 100 / placement.lanes
+                lane_style = (f" left: calc({placement.lane * width:.4g}% + 2px);"
+                              f" width: max(calc({width:.4g}% - 4px), 4px); right: auto; box-sizing: border-box;")
+            
             # Calculate position and height
-            top = (course['start_mins'] - start_hour * 60) * (hour_height / 60)
-            height = (course['end_mins'] - course['start_mins']) * (hour_height / 60)
+            top = (start_mins - start_hour * 60) * (hour_height / 60)
+            height = (end_mins - start_mins) * (hour_height / 60)
             
-            is_lab = course['type'].lower() == 'laboratory'
+            is_lab = course_type.lower() == 'laboratory'
             lab_class = ' laboratory' if is_lab else ''
             
-            html += f"""
-                <div class="course course_{course['safe_name']}{lab_class}"
-                     style="top: {top}px; height: {height}px;">
-                    <div class="course-type">{course['type']}</div>
-                    <div class="time">{course['start']} - {course['end']}</div>
-                    <strong>{course['name']}</strong>
-                    <div class="location">{course['location']}</div>
-                </div>
-            """
+            yield HTML_COURSE_BLOCK.format(
+                top=top, height=height, lab_class=lab_class, lane_style=lane_style,
+                safe_name=safe_names[course_name], type=course_type, name=course_name, location=location,
+                start=format_minutes(start_mins), end=format_minutes(end_mins)
+            )
         
-        html += "</div>"
+        yield "</div>"
     
-    html += """
-        </div>
-    </body>
-    </html>
-    """
+    yield HTML_TAIL
+
+def conflict_report(meetings, group_by=None):
+    """List overlapping meetings as (day, first, second, start, end) rows
     
-    return html
+    Without group_by every pair of overlapping meetings on a day counts,
+    as in one person's timetable. group_by='location' or 'instructor'
+    only compares meetings sharing that value, which finds double-booked
+    rooms or instructors, and adds that value after the day. first and
+    second are section names.
+    """
+    columns = ['day'] + ([group_by] if group_by else [])
+    rows = []
+    for key, group in meetings.groupby(columns, sort=True, observed=True):
+        key = key if isinstance(key, tuple) else (key,)
+        if group_by and not key[1]:
+            continue  # No room or instructor to clash on
+        intervals = zip(group['start_mins'], group['end_mins'], group['section'])
+        for conflict in find_conflicts(intervals):
+            rows.append((*key, conflict.first, conflict.second,
+                         format_minutes(conflict.start), format_minutes(conflict.end)))
+    return rows
+
+def generate_course_calendar(meetings, metrics=NULL_METRICS, title=DEFAULT_TITLE):
+    """Generate HTML calendar from the meeting table"""
+    with metrics.stage('html'):
+        return ''.join(_render_course_calendar(meetings, title))
+
+def write_course_calendar(meetings, f, metrics=NULL_METRICS, title=DEFAULT_TITLE):
+    """Stream the HTML calendar to a text file handle"""
+    with metrics.stage('html'):
+        f.writelines(_render_course_calendar(meetings, title))
 
-def generate_ics_calendar(df, term_start, term_end, selected_term):
-    """Generate ICS calendar from course data"""
-    cal = Calendar()
+def generate_ics_calendar(meetings, term_end, metrics=NULL_METRICS):
+    """Generate ICS calendar from the meeting table"""
+    with metrics.stage('ics'):
+        return _build_ics_calendar(meetings, term_end, metrics)
+
+def _build_ics_calendar(meetings, term_end, metrics):
+    """Build the icalendar object model for generate_ics_calendar"""
+    cal = icalendar.Calendar()
     cal.add('prodid', '-//Course Schedule Calendar//mxm.dk//')
     cal.add('version', '2.0')
     
     tz = pytz.timezone('America/Vancouver')
+    day_map = {'Mon': 0, 'Tue': 1, 'Wed': 2, 'Thu': 3, 'Fri': 4}
+    term_end_date = tz.localize(datetime.combine(parse_date(term_end), datetime.min.time()))
     
     # Track added events to avoid duplicates
     added_events = set()
     
-    for _, row in df.iterrows():
+    for meeting in meetings.itertuples(index=False):
+        section_name = meeting.section  # Use section name for event title
         try:
-            section_name = str(row['Section'])  # Use section name for event title
-            meeting_pattern = str(row['Meeting Patterns'])
+            start_time = format_minutes(meeting.start_mins)
+            
+            # Create unique event identifier
+            event_key = ics_writer.event_key(section_name, meeting.day, start_time, meeting.location)
+            if event_key in added_events:
+                metrics.count('duplicate_events')
+                continue
             
-            if pd.isna(meeting_pattern):
+            day_num = day_map.get(meeting.day)
+            if day_num is None:
                 continue
+            added_events.add(event_key)
             
-            # Get additional information
-            course_type = str(row.get('Instructional Format', ''))
-            instructor = str(row.get('Instructor', ''))
+            # Create event
+            event = icalendar.Event()
+            event.add('summary', section_name)  # Use section name for summary
+            event.add('uid', ics_writer.event_uid(event_key))
+            event.add('dtstamp', ics_writer.DTSTAMP)
             
-            # Parse meeting patterns
-            meetings = parse_meeting_pattern(meeting_pattern)
+            # Add detailed description
+            description = (
+                f"Section: {section_name}\n"
+                f"Type: {meeting.format}\n"
+                f"Location: {meeting.location}\n"
+                f"Instructor: {meeting.instructor}"
+            )
+            event.add('description', description)
+            event.add('location', meeting.location)
             
-            for meeting in meetings:
-                try:
-                    # Check if the meeting is in the selected term
-                    if not is_in_term(meeting['start_date'], selected_term):
-                        continue
-                    
-                    # Create unique event identifier
-                    event_key = f"{section_name}_{meeting['day']}_{meeting['start_time']}_{meeting['location']}"
-                    if event_key in added_events:
-                        continue
-                    added_events.add(event_key)
-                    
-                    # Create event
-                    event = Event()
-                    event.add('summary', section_name)  # Use section name for summary
-                    
-                    # Add detailed description
-                    description = (
-                        f"Section: {section_name}\n"
-                        f"Type: {course_type}\n"
-                        f"Location: {meeting['location']}\n"
-                        f"Instructor: {instructor}"
-                    )
-                    event.add('description', description)
-                    event.add('location', meeting['location'])
-                    
-                    # Parse times
-                    start_time = datetime.strptime(meeting['start_time'], '%H:%M').time()
-                    end_time = datetime.strptime(meeting['end_time'], '%H:%M').time()
-                    
-                    # Combine date and time
-                    day_map = {'Mon': 0, 'Tue': 1, 'Wed': 2, 'Thu': 3, 'Fri': 4}
-                    day_num = day_map.get(meeting['day'])
-                    if day_num is None:
-                        continue
-                    
-                    # Find first occurrence of this day
-                    current_date = datetime.strptime(meeting['start_date'], '%Y-%m-%d')
-                    while current_date.weekday() != day_num:
-                        current_date += timedelta(days=1)
-                    
-                    event_start = datetime.combine(current_date.date(), start_time)
-                    event_end = datetime.combine(current_date.date(), end_time)
-                    
-                    # Localize times
-                    event_start = tz.localize(event_start)
-                    event_end = tz.localize(event_end)
-                    
-                    event.add('dtstart', event_start)
-                    event.add('dtend', event_end)
-                    
-                    # Set recurrence rule to term end date
-                    term_end_date = tz.localize(datetime.strptime(term_end, '%Y/%m/%d'))
-                    event.add('rrule', {
-                        'freq': 'weekly',
-                        'until': term_end_date,
-                        'byday': meeting['day'][:2].upper()
-                    })
-                    
-                    cal.add_component(event)
-                    
-                except Exception as event_error:
-                    print(f"Error creating event for {section_name}: {event_error}")
-                    continue
-                    
-        except Exception as course_error:
-            print(f"Error processing course {course_name}: {course_error}")
+            # First occurrence of this day on or after the start date
+            current_date = meeting.start_date + timedelta(days=(day_num - meeting.start_date.weekday()) % 7)
+            
+            event_start = datetime.combine(current_date, datetime.min.time()) + timedelta(minutes=meeting.start_mins)
+            event_end = datetime.combine(current_date, datetime.min.time()) + timedelta(minutes=meeting.end_mins)
+            
+            # Localize times
+            event.add('dtstart', tz.localize(event_start))
+            event.add('dtend', tz.localize(event_end))
+            
+            # Set recurrence rule to term end date
+            event.add('rrule', {
+                'freq': 'weekly',
+                'until': term_end_date,
+                'byday': meeting.day[:2].upper()
+            })
+            
+            cal.add_component(event)
+            
+        except Exception as event_error:
+            logger.warning("Error creating event for %s: %s", section_name, event_error)
+            metrics.count('event_failures')
             continue
     
     return cal
 
-def process_excel_file(excel_file):
-    """Process Excel file and return cleaned DataFrame"""
+# weekly: one RRULE per meeting until the term ends (as generate_ics_calendar)
+# rrule: RRULE clipped to the meeting's own dates, holidays as EXDATE
+# expanded: one event per class, holidays left out
+ICS_MODES = ['weekly', 'rrule', 'expanded']
+
+def meeting_occurrences(meetings, term_end, registry=None):
+    """Every class date of each meeting as (dates, excluded dates) pairs
+    
+    Dates run weekly from the meeting's start date to its end date or
+    term_end, whichever is earlier (term_end when the end date is
+    missing); dates inside the registry's holidays
+    and breaks are returned separately. Expanded with NumPy in one pass.
+    """
+    index, dates, excluded = expand_meeting_dates(meetings, term_end, registry)
+    return occurrences.group_occurrences(len(meetings), index, dates, excluded)
+
+def expand_meeting_dates(meetings, term_end, registry=None):
+    """meeting_occurrences as flat (row position, date, excluded) arrays, see occurrences.expand_weekly"""
+    weekdays = meetings['day'].map(ics_writer.DAY_NUMBERS).astype('float64')
+    start_days = pd.to_datetime(meetings['start_date']).to_numpy().astype('datetime64[D]')
+    end_days = pd.to_datetime(meetings['end_date']).to_numpy().astype('datetime64[D]')
+    
+    # A missing end date runs to term_end; unknown days get no dates, as
+    # the writer skips those meetings anyway
+    term_end_day = np.datetime64(parse_date(term_end), 'D')
+    end_days = np.minimum(np.where(np.isnat(end_days), term_end_day, end_days), term_end_day)
+    end_days[weekdays.isna().to_numpy()] = np.datetime64('NaT')
+    
+    return occurrences.expand_weekly(
+        start_days, end_days, weekdays.fillna(0).to_numpy(dtype='int64'),
+        occurrences.holiday_dates(registry or default_registry())
+    )
+
+def write_ics_calendar(meetings, term_end, f, metrics=NULL_METRICS, mode='weekly'):
+    """Stream the meeting table as ICS to a binary file, bypassing icalendar
+    
+    In the default 'weekly' mode this produces the same events as
+    generate_ics_calendar without building the calendar object model in
+    memory; see ICS_MODES for the others. Returns the number of events
+    written.
+    """
+    if mode not in ICS_MODES:
+        raise ValueError(f"Invalid ICS mode: {mode}")
+    with metrics.stage('ics'):
+        schedule = meeting_occurrences(meetings, term_end) if mode != 'weekly' else None
+        return ics_writer.write_calendar(f, meetings.itertuples(index=False), term_end, metrics=metrics,
+                                         occurrences=schedule, expand=mode == 'expanded')
+
+def meeting_events(meetings, term_end, mode='weekly', metrics=NULL_METRICS):
+    """(uid, property lines) of each event write_ics_calendar would write, for ics_publish"""
+    if mode not in ICS_MODES:
+        raise ValueError(f"Invalid ICS mode: {mode}")
+    schedule = meeting_occurrences(meetings, term_end) if mode != 'weekly' else None
+    return ics_writer.iter_events(meetings.itertuples(index=False), term_end, metrics=metrics,
+                                  occurrences=schedule, expand=mode == 'expanded')
+
+def iter_excel_rows(excel_file):
+    """Stream the needed columns of the first sheet as one dict per row"""
+    return table_readers.iter_rows(excel_file)
+
+def process_excel_file(excel_file, stream=False, metrics=NULL_METRICS):
+    """Process an export (.xlsx, .xls, CSV or TSV) and return cleaned DataFrame
+    
+    The format is sniffed from the content and read by the cheapest
+    reader for it (see table_readers). With stream=True, return a
+    constant-memory row iterator instead; its read time is then recorded
+    by build_meeting_table.
+    """
+    if stream:
+        return iter_excel_rows(excel_file)
+    
     try:
-        df = pd.read_excel(excel_file, engine='openpyxl', header=2)
-        df = df.dropna(how='all')
-        print("\nDetected columns:", df.columns.tolist())
+        with metrics.stage('read'):
+            df = table_readers.read_table(excel_file)
+        logger.info("Detected columns: %s", df.columns.tolist())
         return df
     except Exception as e:
-        print(f"Error reading Excel file: {e}")
+        logger.error("Error reading Excel file: %s", e)
         raise
 
-def main():
+def partition_by_term(meetings, registry=None):
+    """Split a meeting table into {term id: table} in one pass
+    
+    Each meeting goes to the term containing its start date; meetings
+    outside every known term are dropped.
+    """
+    registry = registry or default_registry()
+    term_of = {day: registry.find(day) for day in meetings['start_date'].unique()}
+    term_ids = meetings['start_date'].map(lambda day: term_of[day].id if term_of[day] else None)
+    
+    return {
+        term.id: meetings[term_ids == term.id].reset_index(drop=True)
+        for term in registry.terms
+        if (term_ids == term.id).any()
+    }
+
+def convert_file(excel_file, out_dir, term, stream=False, use_cache=True, metrics=NULL_METRICS, ics_mode='weekly',
+                 html_mode='full', asset_dir=None, stem=None):
+    """Convert one workbook into <name>.html and <name>.ics inside out_dir
+    
+    name is stem, by default the workbook's file name without extension
+    (see output_stems).
+    
+    With term='all', every term found in the workbook is written in a
+    single pass as <name>_<term id>.html/.ics.
+    
+    With html_mode='compact' the page embeds its meetings as JSON and
+    links the shared stylesheet and renderer, written once to asset_dir
+    (default out_dir); see html_compact.
+    
+    Results are cached by the workbook's SHA-256, the term, the term
+    registry's digest, the modes and GENERATOR_VERSION, so unchanged
+    inputs are served by copying files. The parsed meeting tables are
+    cached separately, keyed by PARSER_VERSION instead of the render
+    settings, so a render-only change reuses them without reading the
+    workbook again.
+    Returns the list of written paths.
+    """
+    if term != 'all':
+        get_term_dates(term)  # Fail fast on an invalid term
+    os.makedirs(out_dir, exist_ok=True)
+    base_path = os.path.join(out_dir, stem or os.path.splitext(os.path.basename(excel_file))[0])
+    
+    prefix = None
+    if html_mode == 'compact':
+        import html_compact
+        asset_dir = asset_dir or out_dir
+        html_compact.write_assets(asset_dir)
+        prefix = html_compact.asset_prefix(out_dir, asset_dir)
+    
+    cache_key = meetings_key = None
+    if use_cache:
+        input_digest = calendar_cache.file_digest(excel_file)
+        meetings_key = calendar_cache.make_key(input_digest, term, default_registry().digest(), PARSER_VERSION,
+                                               'meetings')
+        cache_key = calendar_cache.make_key(input_digest, term, default_registry().digest(), PARSER_VERSION,
+                                            GENERATOR_VERSION, ics_mode, html_mode, prefix)
+        entry = calendar_cache.lookup(cache_key)
+        paths = _copy_cached(entry, base_path) if entry else None
+        if paths is not None:
+            metrics.count('cache_hits')
+            return paths
+    
+    tables = _load_cached_tables(meetings_key) if meetings_key else None
+    if tables is not None:
+        metrics.count('meeting_cache_hits')
+    else:
+        tables = _parse_tables(excel_file, term, stream, metrics)
+        if meetings_key:
+            _store_cached_tables(meetings_key, tables)
+    
+    outputs = {}
+    for suffix, (meetings, term_id) in tables.items():
+        term_end = get_term_dates(term_id)[1]
+        # A failed render leaves any previous output in place rather than a truncated file
+        if html_mode == 'compact':
+            write_atomic(base_path + suffix + '.html', 'w',
+                         lambda f: html_compact.write_compact_calendar(meetings, f, prefix, metrics))
+        else:
+            write_atomic(base_path + suffix + '.html', 'w', lambda f: write_course_calendar(meetings, f, metrics))
+        write_atomic(base_path + suffix + '.ics', 'wb',
+                     lambda f: write_ics_calendar(meetings, term_end, f, metrics, ics_mode))
+        outputs[suffix + '.html'] = base_path + suffix + '.html'
+        outputs[suffix + '.ics'] = base_path + suffix + '.ics'
+    
+    if cache_key:
+        files = {}
+        for suffix, path in outputs.items():
+            with open(path, 'rb') as f:
+                files['out' + suffix] = f.read()
+        calendar_cache.store(cache_key, files)
+    
+    return list(outputs.values())
+
+def _parse_tables(excel_file, term, stream, metrics):
+    """Read and parse a workbook into {output suffix: (meeting table, term id)}"""
+    df = process_excel_file(excel_file, stream=stream, metrics=metrics)
+    if term == 'all':
+        meetings = build_meeting_table(df, metrics=metrics)
+        with metrics.stage('filter'):
+            return {f"_{term_id}": (table, term_id) for term_id, table in partition_by_term(meetings).items()}
+    return {'': (build_meeting_table(df, term, metrics=metrics), term)}
+
+def _store_cached_tables(key, tables):
+    """Cache parsed tables as versioned JSONL exports plus a {suffix: term id} index"""
+    import meeting_export
+    
+    files = {'tables.json': json.dumps({suffix: term_id for suffix, (_, term_id) in tables.items()}).encode('utf-8')}
+    for suffix, (meetings, _) in tables.items():
+        files[f'meetings{suffix}.jsonl'] = meeting_export.jsonl_bytes(meetings)
+    calendar_cache.store(key, files)
+
+def _load_cached_tables(key):
+    """The meeting tables cached under key, or None on a miss
+    
+    Any unreadable entry (evicted meanwhile, truncated, or written with an
+    older export schema) counts as a miss so the workbook is parsed again.
+    """
+    import meeting_export
+    
+    entry = calendar_cache.lookup(key)
+    if not entry:
+        return None
+    try:
+        with open(os.path.join(entry, 'tables.json'), encoding='utf-8') as f:
+            term_ids = json.load(f)
+        return {suffix: (meeting_export.read_meetings(os.path.join(entry, f'meetings{suffix}.jsonl')), term_id)
+                for suffix, term_id in term_ids.items()}
+    except Exception as e:
+        logger.warning("Ignoring unreadable cached meetings in %s: %s", entry, e)
+        return None
+
+def _copy_cached(entry, base_path):
+    """Copy a cache entry's outputs next to base_path
+    
+    Outputs are stored as 'out' + the suffix of the output path. Returns
+    the written paths, or None if the entry was evicted meanwhile.
+    """
+    paths = []
+    try:
+        for name in sorted(os.listdir(entry)):
+            if name.startswith('out'):
+                paths.append(base_path + name[len('out'):])
+                with open(os.path.join(entry, name), 'rb') as cached:
+                    write_atomic(paths[-1], 'wb', lambda f: shutil.copyfileobj(cached, f))
+    except FileNotFoundError:
+        return None
+    return paths
+
+def _convert_job(excel_file, out_dir, term, stream, use_cache, track_allocations=False, profile_path=None, profiler='cprofile',
+                 ics_mode='weekly', html_mode='full', asset_dir=None, stem=None):
+    """Worker entry point: returns (elapsed seconds, error message or None, metrics dict)"""
+    metrics = PipelineMetrics(track_allocations=track_allocations)
+    started = time.perf_counter()
+    try:
+        with profile(profile_path, profiler):
+            convert_file(excel_file, out_dir, term, stream, use_cache, metrics, ics_mode, html_mode, asset_dir, stem)
+        return time.perf_counter() - started, None, metrics.to_dict()
+    except Exception as e:
+        return time.perf_counter() - started, f"{type(e).__name__}: {e}", metrics.to_dict()
+
+def find_excel_files(in_dir):
+    """List every export (.xlsx, .xls, .csv, .tsv) below in_dir, skipping Excel lock files"""
+    found = []
+    for dirpath, _, filenames in os.walk(in_dir):
+        for name in filenames:
+            if name.lower().endswith(table_readers.INPUT_EXTENSIONS) and not name.startswith('~$'):
+                found.append(os.path.join(dirpath, name))
+    return sorted(found)
+
+def number_stem(stem, stems):
+    """stem, numbered past any stem already in stems, which it is added to
+    
+    Taken stems get -2, -3 and so on. stems holds lowercased stems,
+    keeping names distinct on case-insensitive file systems too.
+    """
+    candidate, n = stem, 2
+    while candidate.lower() in stems:
+        candidate, n = f"{stem}-{n}", n + 1
+    stems.add(candidate.lower())
+    return candidate
+
+def output_stems(excel_files, flat=False):
+    """{path: output file stem} for exports converted side by side
+    
+    The stem is the file name without its extension, unless another export
+    in the same directory has the same one (foo.xlsx and foo.csv). Those
+    keep their extension, as foo_xlsx and foo_csv, so their outputs do not
+    overwrite each other. A stem still taken in its output directory is
+    numbered by number_stem. Outputs go next to their source, or with
+    flat all into one directory.
+    """
+    groups = {}
+    for path in excel_files:
+        directory, name = os.path.split(path)
+        groups.setdefault((directory, os.path.splitext(name)[0].lower()), []).append(path)
+    
+    names = {}
+    for paths in groups.values():
+        for path in paths:
+            stem, extension = os.path.splitext(os.path.basename(path))
+            names[path] = f"{stem}_{extension[1:].lower()}" if len(paths) > 1 else stem
+    
+    stems, taken = {}, {}
+    for path in excel_files:
+        stems[path] = number_stem(names[path], taken.setdefault('' if flat else os.path.dirname(path), set()))
+    return stems
+
+def batch_convert(in_dir, out_dir, term, jobs=None, stream=False, use_cache=True,
+                  track_allocations=False, profile_dir=None, profiler='cprofile', ics_mode='weekly', html_mode='full'):
+    """Convert every workbook under in_dir in a process pool
+    
+    Outputs mirror the input directory layout and are named by
+    output_stems; compact HTML pages share
+    one copy of the assets at the top of out_dir. With profile_dir, each
+    conversion is profiled into <profile_dir>/<name>.prof (or .html for
+    pyinstrument). Returns a list of (excel_file, elapsed seconds,
+    error message or None, metrics dict).
+    """
+    if term != 'all':
+        get_term_dates(term)  # Fail fast on an invalid term
+    excel_files = find_excel_files(in_dir)
+    stems = output_stems(excel_files)
+    results = []
+    
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {}
+        for excel_file in excel_files:
+            relative_dir = os.path.relpath(os.path.dirname(excel_file), in_dir)
+            target_dir = os.path.normpath(os.path.join(out_dir, relative_dir))
+            profile_path = None
+            if profile_dir:
+                os.makedirs(profile_dir, exist_ok=True)
+                extension = '.html' if profiler == 'pyinstrument' else '.prof'
+                name = os.path.normpath(os.path.join(relative_dir, stems[excel_file])).replace(os.sep, '_')
+                profile_path = os.path.join(profile_dir, name + extension)
+            job = executor.submit(_convert_job, excel_file, target_dir, term, stream, use_cache,
+                                  track_allocations, profile_path, profiler, ics_mode, html_mode, out_dir,
+                                  stems[excel_file])
+            futures[job] = excel_file
+        
+        for future in as_completed(futures):
+            results.append((futures[future], *future.result()))
+    
+    return sorted(results)
+
+def print_batch_summary(results, wall_time):
+    """Print successes, failures and timings of a batch run"""
+    failures = [(f, error) for f, _, error, _ in results if error]
+    timings = [elapsed for _, elapsed, _, _ in results]
+    
+    print(f"\nConverted {len(results) - len(failures)} of {len(results)} files in {wall_time:.2f}s")
+    if timings:
+        print(f"Per file: mean {sum(timings) / len(timings):.3f}s, max {max(timings):.3f}s")
+    for excel_file, error in failures:
+        print(f"FAILED {excel_file}: {error}")
+
+def write_ics_file(excel_file, out_file, term):
+    """Fast path from one workbook to an ICS file, using only the row reader
+    
+    Skips the pandas meeting table entirely, so pandas and numpy are never
+    imported. Returns 0 on success for use as an exit code.
+    """
+    term_end = get_term_dates(term)[1]
+    meetings = iter_meetings(iter_excel_rows(excel_file), term)
+    count = write_atomic(out_file, 'wb', lambda f: ics_writer.write_calendar(f, meetings, term_end))
+    print(f"Wrote {count} events to {out_file}")
+    return 0
+
+def run_cli(argv):
+    """Non-interactive command line entry point"""
+    parser = argparse.ArgumentParser(prog='xlsx_to_calendar')
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    batch = commands.add_parser('batch', help='convert every export (.xlsx, .xls, .csv, .tsv) under a directory')
+    batch.add_argument('in_dir')
+    batch.add_argument('out_dir')
+    batch.add_argument('--term', default='term1', help="term id or alias from the term registry, or 'all'")
+    batch.add_argument('--jobs', type=int, default=None, help='worker processes (default: CPU count)')
+    batch.add_argument('--stream', action='store_true', help='use the constant-memory Excel reader')
+    batch.add_argument('--no-cache', dest='use_cache', action='store_false', help='always reconvert, ignoring cached outputs')
+    batch.add_argument('--metrics', help='write per-stage timings and counters as JSON to this path')
+    batch.add_argument('--track-allocations', action='store_true', help='record tracemalloc stats per stage (slower)')
+    batch.add_argument('--profile-dir', help='profile each conversion into this directory')
+    batch.add_argument('--profiler', choices=['cprofile', 'pyinstrument'], default='cprofile')
+    batch.add_argument('--ics-mode', choices=ICS_MODES, default='weekly',
+                       help="'rrule' clips to each meeting's dates and adds holidays as EXDATE; 'expanded' writes every class")
+    batch.add_argument('--html-mode', choices=HTML_MODES, default='full',
+                       help="'compact' embeds meetings as JSON and shares one stylesheet and script across pages")
+    
+    ics = commands.add_parser('ics', help='write the ICS calendar of one workbook without loading pandas')
+    ics.add_argument('excel_file')
+    ics.add_argument('out_file')
+    ics.add_argument('--term', default='term1', help='term id or alias from the term registry')
+    
+    conflicts = commands.add_parser('conflicts', help='list overlapping meetings of one workbook as CSV')
+    conflicts.add_argument('excel_file')
+    conflicts.add_argument('--term', default='term1', help='term id or alias from the term registry')
+    conflicts.add_argument('--by', choices=['location', 'instructor'], help='only compare meetings sharing this value')
+    
+    aggregate = commands.add_parser('aggregate', help='merge many exports (.xlsx, .xls, .csv, .tsv) into per-room, per-instructor and per-course calendars')
+    aggregate.add_argument('inputs', nargs='+', help='exports, or directories searched for .xlsx, .xls, .csv and .tsv files')
+    aggregate.add_argument('out_dir')
+    aggregate.add_argument('--term', default='term1', help='term id or alias from the term registry')
+    aggregate.add_argument('--jobs', type=int, default=None, help='worker processes for reading workbooks')
+    aggregate.add_argument('--stream', action='store_true', help='use the constant-memory Excel reader')
+    aggregate.add_argument('--metrics', help='write per-stage timings and counters as JSON to this path')
+    aggregate.add_argument('--html-mode', choices=HTML_MODES, default='full')
+    
+    export = commands.add_parser('export', help='write the parsed meeting table as Parquet, Arrow or JSONL')
+    export.add_argument('excel_file')
+    export.add_argument('out_file', help='.parquet, .arrow/.feather (need pyarrow) or .jsonl')
+    export.add_argument('--term', default='term1', help="term id or alias from the term registry, or 'all'")
+    export.add_argument('--stream', action='store_true', help='use the constant-memory Excel reader')
+    
+    publish = commands.add_parser('publish', help='update a subscription feed, bumping SEQUENCE only on changed events')
+    publish.add_argument('excel_file')
+    publish.add_argument('out_file')
+    publish.add_argument('--term', default='term1', help='term id or alias from the term registry')
+    publish.add_argument('--ics-mode', choices=ICS_MODES, default='weekly')
+    publish.add_argument('--state', help='state file of previously published events (default: OUT_FILE.state.json)')
+    publish.add_argument('--delta', metavar='FILE', help='also write a feed of only the added, changed and cancelled events')
+    
+    site = commands.add_parser('site', help='write a static site of weekly, per-course and per-room pages')
+    site.add_argument('schedule', help='workbook or CSV export, or a meeting table written by export')
+    site.add_argument('out_dir')
+    site.add_argument('--term', default='term1', help='term id or alias from the term registry')
+    site.add_argument('--jobs', type=int, default=None, help='worker processes for rendering pages')
+    site.add_argument('--html-mode', choices=HTML_MODES, default='full')
+    
+    render = commands.add_parser('render', help='write HTML and ICS calendars from an exported meeting table')
+    render.add_argument('meetings_file')
+    render.add_argument('out_dir')
+    render.add_argument('--term', default='term1', help='term to render; its end date bounds the ICS events')
+    render.add_argument('--ics-mode', choices=ICS_MODES, default='weekly')
+    
+    watch = commands.add_parser('watch', help='regenerate calendars as workbooks under a directory change')
+    watch.add_argument('in_dir')
+    watch.add_argument('out_dir')
+    watch.add_argument('--term', default='term1', help='term id or alias from the term registry')
+    watch.add_argument('--aggregate', metavar='DIR', help='also keep per-room, per-instructor and per-course views here')
+    watch.add_argument('--interval', type=float, default=1.0, help='seconds between scans')
+    watch.add_argument('--debounce', type=float, default=2.0, help='seconds a file must stay unchanged before converting')
+    watch.add_argument('--ics-mode', choices=ICS_MODES, default='weekly')
+    
+    serve = commands.add_parser('serve', help='run the HTTP conversion service')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8000)
+    serve.add_argument('--jobs', type=int, default=None, help='worker processes (default: CPU count)')
+    serve.add_argument('--queue', type=int, default=16, help='uploads allowed to wait for a worker before answering 503')
+    
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s %(message)s')
+    
+    if args.command == 'ics':
+        return write_ics_file(args.excel_file, args.out_file, args.term)
+    if args.command == 'conflicts':
+        meetings = build_meeting_table(process_excel_file(args.excel_file), args.term)
+        writer = csv.writer(sys.stdout)
+        writer.writerow(['day', *([args.by] if args.by else []), 'first', 'second', 'start', 'end'])
+        writer.writerows(conflict_report(meetings, args.by))
+        return 0
+    if args.command == 'aggregate':
+        from aggregation import aggregate as run_aggregate
+        metrics = PipelineMetrics()
+        manifest = run_aggregate(args.inputs, args.out_dir, args.term, args.jobs, args.stream, metrics, args.html_mode)
+        counts = ', '.join(f"{len(entries)} {view}" for view, entries in manifest.items())
+        print(f"Merged {metrics.counters['meetings']} meetings "
+              f"({metrics.counters['duplicate_meetings']} duplicates dropped) into {counts}")
+        if args.metrics:
+            metrics.write_json(args.metrics)
+        return 0
+    if args.command == 'export':
+        from meeting_export import write_meetings
+        term = None if args.term == 'all' else args.term
+        meetings = build_meeting_table(process_excel_file(args.excel_file, args.stream), term)
+        path = write_meetings(meetings, args.out_file)
+        print(f"Wrote {len(meetings)} meetings to {path}")
+        return 0
+    if args.command == 'publish':
+        from ics_publish import publish as publish_feed
+        meetings = build_meeting_table(process_excel_file(args.excel_file), args.term)
+        events = meeting_events(meetings, get_term_dates(args.term)[1], args.ics_mode)
+        counts = publish_feed(events, args.out_file, args.state or args.out_file + '.state.json', args.delta)
+        print(f"Published {args.out_file}: " + ', '.join(f"{n} {status}" for status, n in counts.items()))
+        return 0
+    if args.command == 'site':
+        from meeting_export import EXTENSIONS, read_term_meetings
+        from site_generator import generate_site
+        if os.path.splitext(args.schedule)[1].lower() in EXTENSIONS:
+            meetings = read_term_meetings(args.schedule, args.term)
+        else:
+            meetings = build_meeting_table(process_excel_file(args.schedule), args.term)
+        started = time.perf_counter()
+        pages = generate_site(meetings, args.out_dir, args.term, args.jobs, args.html_mode)
+        print(f"Wrote {pages} pages to {args.out_dir} in {time.perf_counter() - started:.2f}s")
+        return 0
+    if args.command == 'render':
+        from meeting_export import read_term_meetings
+        meetings = read_term_meetings(args.meetings_file, args.term)
+        base_path = os.path.join(args.out_dir, os.path.splitext(os.path.basename(args.meetings_file))[0])
+        os.makedirs(args.out_dir, exist_ok=True)
+        write_atomic(base_path + '.html', 'w', lambda f: write_course_calendar(meetings, f))
+        write_atomic(base_path + '.ics', 'wb',
+                     lambda f: write_ics_calendar(meetings, get_term_dates(args.term)[1], f, mode=args.ics_mode))
+        print(f"Wrote {base_path}.html and {base_path}.ics")
+        return 0
+    if args.command == 'watch':
+        from watcher import Watcher
+        return Watcher(args.in_dir, args.out_dir, args.term, args.aggregate, args.interval,
+                       args.debounce, args.ics_mode).run()
+    if args.command == 'serve':
+        from conversion_service import serve as run_service
+        return run_service(args.host, args.port, args.jobs, args.queue)
+    
+    started = time.perf_counter()
+    results = batch_convert(args.in_dir, args.out_dir, args.term, args.jobs, args.stream, args.use_cache,
+                            args.track_allocations, args.profile_dir, args.profiler, args.ics_mode, args.html_mode)
+    wall_time = time.perf_counter() - started
+    print_batch_summary(results, wall_time)
+    
+    if args.metrics:
+        totals = PipelineMetrics()
+        for _, _, _, file_metrics in results:
+            totals.merge(file_metrics)
+        files = {f: {'seconds': elapsed, 'error': error, **file_metrics} for f, elapsed, error, file_metrics in results}
+        totals.write_json(args.metrics, wall_seconds=wall_time, files=files)
+    
+    return 1 if any(error for _, _, error, _ in results) else 0
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv:
+        return run_cli(argv)
+    
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
     try:
         # List Excel files
-        excel_files = [f for f in os.listdir() if f.endswith(('.xlsx', '.xls'))]
+        excel_files = [f for f in os.listdir() if f.lower().endswith(table_readers.INPUT_EXTENSIONS)]
         for i, file in enumerate(excel_files, 1):
             print(f"{i}. {file}")
         
@@ -506,24 +1130,29 @@ def main():
         print(f"\nProcessing {excel_file}...")
         
         # Select term
+        terms = default_registry().terms
         print("\nSelect term:")
-        print("1. Term 1 (Sep 3 - Dec 6)")
-        print("2. Term 2 (Jan 6 - Apr 6)")
-        term_choice = input("Enter term number (1 or 2): ")
-        term = 'term1' if term_choice == '1' else 'term2'
+        for i, t in enumerate(terms, 1):
+            print(f"{i}. {t.name} ({t.start:%b} {t.start.day} - {t.end:%b} {t.end.day})")
+        term_choice = int(input(f"Enter term number (1-{len(terms)}): "))
+        if not (1 <= term_choice <= len(terms)):
+            print("Invalid selection")
+            return
+        term = terms[term_choice - 1].id
         term_start, term_end = get_term_dates(term)
         
-        # Process Excel file
+        # Process Excel file and parse meetings once
         df = process_excel_file(excel_file)
+        meetings = build_meeting_table(df, term)
         
         # Generate and save HTML calendar
-        html_content = generate_course_calendar(df, term)
+        html_content = generate_course_calendar(meetings)
         with open('course_calendar.html', 'w', encoding='utf-8') as f:
             f.write(html_content)
         print("\nHTML calendar generated successfully!")
         
         # Generate and save ICS calendar
-        cal = generate_ics_calendar(df, term_start, term_end, term)
+        cal = generate_ics_calendar(meetings, term_end)
         with open('course_calendar.ics', 'wb') as f:
             f.write(cal.to_ical())
         print("ICS calendar generated successfully!")
@@ -540,4 +1169,4 @@ def main():
         print("3. Try saving the Excel file with a different name")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file